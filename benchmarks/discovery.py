@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Times SwaggerApiHandler.find_api on applications with growing numbers of
+URLSpecs, against the previous inspect.getmembers() based discovery.
+
+    python benchmarks/discovery.py [max_urlspecs]
+"""
+import os
+import sys
+import time
+import inspect
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tornado.web import RequestHandler
+from tornado_swagger import swagger
+from tornado_swagger.views import SwaggerApiHandler
+from helpers import make_handler
+
+__author__ = 'serena'
+
+
+class BaseHandler(RequestHandler):
+    def helper_one(self):
+        pass
+
+    def helper_two(self):
+        pass
+
+
+def getmembers_find_api(host_handlers):
+    for host, handlers in host_handlers:
+        for spec in handlers:
+            for (name, member) in inspect.getmembers(spec.handler_class):
+                if inspect.ismethod(member) and hasattr(member, 'rest_api'):
+                    spec_path = spec._path % tuple(['{%s}' % arg for arg in member.rest_api.func_args])
+                    operations = [member.rest_api for (name, member) in inspect.getmembers(spec.handler_class)
+                                  if hasattr(member, 'rest_api')]
+                    yield spec_path, spec, operations
+                    break
+
+
+def timed(find_api, handlers):
+    start = time.time()
+    count = sum(1 for _ in find_api(handlers))
+    return count, time.time() - start
+
+
+def main():
+    max_specs = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    handler_classes = [make_handler(index, BaseHandler) for index in range(max_specs)]
+    print('%8s %14s %14s %12s' % ('urlspecs', 'indexed (ms)', 'getmembers', 'us/urlspec'))
+    for size in (max_specs // 8, max_specs // 4, max_specs // 2, max_specs):
+        app = swagger.Application([(r'/items%d/([^/]+)' % i, handler_classes[i]) for i in range(size)])
+        timed(SwaggerApiHandler.find_api, app.handlers)
+        count, indexed = timed(SwaggerApiHandler.find_api, app.handlers)
+        _, legacy = timed(getmembers_find_api, app.handlers)
+        assert count == size
+        print('%8d %14.1f %14.1f %12.1f' % (size, indexed * 1000, legacy * 1000, indexed * 1e6 / size))
+
+
+if __name__ == "__main__":
+    main()
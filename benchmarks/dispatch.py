@@ -0,0 +1,40 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures the cost of calling a documented handler method, as Tornado does on
+every request: undecorated, wrapped by swagger.operation (the default), and
+decorated with wrap_operations=False, which leaves the method as it is.
+
+    python benchmarks/dispatch.py [calls]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import make_handler
+
+__author__ = 'serena'
+
+
+def main():
+    from tornado_swagger import swagger
+
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    handlers = [('undecorated', make_handler(0, decorate=False))]
+    swagger.docs(wrap_operations=True)
+    handlers.append(('wrapped (default)', make_handler(1)))
+    swagger.docs(wrap_operations=False)
+    handlers.append(('wrap_operations=False', make_handler(2)))
+
+    print('%d calls of get(self, arg)' % calls)
+    for title, cls in handlers:
+        handler = cls.__new__(cls)
+        method = getattr(handler, 'get')
+        elapsed = min(timeit.repeat(lambda: method('1'), number=calls, repeat=7))
+        print('%-24s %8.1f ns per call' % (title, elapsed * 1e9 / calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Checks that the built-in epytext parser gives the same fields as epydoc on the
+corpus of docstrings of tests/test_epytext.py, then compares their throughput.
+
+    python benchmarks/docstrings.py [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tornado_swagger.epytext import parse_fields, parse_fields_epydoc
+from tests.test_epytext import CORPUS, as_tuples
+
+__author__ = 'serena'
+
+
+def check_equivalence():
+    mismatches = 0
+    for doc in CORPUS:
+        fast, reference = as_tuples(parse_fields(doc)), as_tuples(parse_fields_epydoc(doc))
+        if fast != reference:
+            mismatches += 1
+            print('MISMATCH:\n  fast:   %r\n  epydoc: %r' % (fast, reference))
+    print('%d/%d docstrings equivalent' % (len(CORPUS) - mismatches, len(CORPUS)))
+    return mismatches
+
+
+def throughput(parse, iterations):
+    start = time.time()
+    for _ in range(iterations):
+        for doc in CORPUS:
+            parse(doc)
+    return iterations * len(CORPUS) / (time.time() - start)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    mismatches = check_equivalence()
+    fast = throughput(parse_fields, iterations)
+    reference = throughput(parse_fields_epydoc, iterations)
+    print('fast:   %10.0f docstrings/s' % fast)
+    print('epydoc: %10.0f docstrings/s (%.1fx slower)' % (reference, fast / reference))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Compares the spec of an application with many documented handlers served as
+json, MessagePack and CBOR (whichever of msgpack and cbor2 are installed): the
+size of the payload, raw and gzipped, and the time a client takes to decode it.
+
+    python benchmarks/formats.py [handlers]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__author__ = 'serena'
+
+
+def main():
+    import json
+    from tornado_swagger import swagger
+    from tornado_swagger.compress import compress
+    from tornado_swagger.formats import msgpack, cbor2
+    from tornado_swagger.settings import default_settings
+    from tornado_swagger.views import SwaggerApiHandler
+    from helpers import make_app
+
+    handlers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = make_app(handlers)
+    swagger.warm_up(app)
+    entry = SwaggerApiHandler.cached_spec(app, default_settings['api_version'],
+                                          default_settings['exclude_namespaces'], 'http://localhost', None, 'localhost')
+    formats = [('json', None, json.loads)]
+    if msgpack:
+        formats.append(('msgpack', 'msgpack', lambda data: msgpack.unpackb(data, raw=False)))
+    if cbor2:
+        formats.append(('cbor', 'cbor', cbor2.loads))
+
+    print('%d handlers, spec of all the apis' % handlers)
+    print('%-10s %12s %12s %14s' % ('', 'kB', 'gzip kB', 'decode ms'))
+    document = None
+    for title, fmt, decode in formats:
+        data = entry.body(False, fmt).data()
+        decoded = decode(data)
+        assert document is None or decoded == document
+        document = decoded
+        elapsed = min(timeit.repeat(lambda: decode(data), number=1, repeat=5))
+        print('%-10s %12.1f %12.1f %14.1f' % (title, len(data) / 1024.0, len(compress(data, 'gzip')) / 1024.0,
+                                             elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
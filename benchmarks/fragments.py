@@ -0,0 +1,58 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures the serialization of the specs of an application with many
+documented handlers, once the documents are built: encoding every spec
+from scratch, as before, against joining the json fragments kept by the
+operations and models.
+
+    python benchmarks/fragments.py [handlers] [hosts]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__author__ = 'serena'
+
+
+def main():
+    from tornado.escape import utf8
+    from tornado_swagger import swagger
+    from tornado_swagger.cache import SpecBody, spec_cache
+    from tornado_swagger.settings import default_settings
+    from tornado_swagger.views import SwaggerApiHandler, application_resources, json_dumps
+    from helpers import make_app
+
+    handlers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    hosts = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    app = make_app(handlers)
+    swagger.warm_up(app)
+    api_version = default_settings['api_version']
+    exclude_namespaces = default_settings['exclude_namespaces']
+    resources = [None] + list(application_resources(app, exclude_namespaces))
+    documents = [SwaggerApiHandler.spec_document(app, api_version, exclude_namespaces, r) for r in resources]
+    base_paths = ['http://host%d.example.com' % i for i in range(hosts)]
+
+    def encode():
+        spec_cache.entries.clear()
+        for base_path in base_paths:
+            for resource, document in zip(resources, documents):
+                spec_cache.set(('spec', id(app), base_path, resource), lambda pretty, document=document: SpecBody(
+                    utf8(json_dumps(dict(document, basePath=base_path), pretty))))
+
+    def join():
+        spec_cache.entries.clear()
+        for base_path in base_paths:
+            for resource in resources:
+                SwaggerApiHandler.cached_spec(app, api_version, exclude_namespaces, base_path, resource)
+
+    join()
+    print('%d handlers, %d specs for each of %d hosts' % (handlers, len(resources), hosts))
+    for title, func in (('encoded from scratch', encode), ('joined from fragments', join)):
+        print('%-24s %8.1f ms' % (title, min(timeit.repeat(func, number=1, repeat=3)) * 1000))
+
+
+if __name__ == "__main__":
+    main()
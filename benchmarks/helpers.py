@@ -0,0 +1,207 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+What the benchmarks share: the handlers, models and applications they
+measure, built in memory or written as a module, and the running of a
+measure in fresh processes.
+"""
+import os
+import sys
+import json
+import resource
+import subprocess
+
+__author__ = 'serena'
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+METHODS = ('get', 'post', 'put', 'delete', 'patch')
+
+MODEL_DOC = """
+    @description: model %d
+    @ptype child: L{Model0}
+"""
+
+GET_DOC = """
+    @param fields: fields to return
+    @type fields: L{string}
+    @in fields: query
+    @rtype: L{Model%d}
+    @description: get an item
+    @notes: returns one item with all of its fields
+"""
+
+PUT_DOC = """
+    @param body: the new item
+    @type body: L{Model%d}
+    @in body: body
+    @return 200: item is updated.
+    @raise 400: invalid input
+"""
+
+MODEL_TEMPLATE = '''
+
+@swagger.model()
+class Model%(index)d(object):
+    """
+        @description: model %(index)d
+        @ptype size: L{integer}
+        @ptype price: L{number}%(nested)s
+    """
+    def __init__(self, name, size=0, price=0%(nested_args)s):
+        pass
+'''
+
+NESTED_DOC = '''
+        @ptype child: L{Model%(child)d}
+        @ptype children: C{list} of L{Model%(child)d}'''
+
+GET_TEMPLATE = '''
+    @swagger.operation(nickname='get%(index)d')
+    def get(self, arg):
+        """
+            @param fields: fields to return
+            @type fields: L{string}
+            @in fields: query
+            @required fields: False
+            @param limit: how many items
+            @type limit: L{integer}
+            @in limit: query
+            @rtype: L{Model%(model)d}
+            @description: get an item
+            @notes: GET /items%(index)d/1?fields=name
+        """
+'''
+
+BODY_TEMPLATE = '''
+    @swagger.operation(nickname='%(method)s%(index)d')
+    def %(method)s(self, arg):
+        """
+            @param body: the item
+            @type body: L{Model%(model)d}
+            @in body: body
+            @return 200: item is saved.
+            @raise 400: invalid input
+            @description: %(method)s an item
+        """
+'''
+
+DELETE_TEMPLATE = '''
+    @swagger.operation(nickname='delete%(index)d')
+    def delete(self, arg):
+        """
+            @description: delete an item
+            @return 204: item is deleted.
+            @raise 404: no such item
+        """
+'''
+
+
+def make_model(name, members=None, doc=None, decorate=True, **options):
+    """
+    Returns a new class name with members and doc, decorated with
+    @swagger.model(**options) unless decorate is False.
+    """
+    from tornado_swagger import swagger
+
+    cls = type(name, (object,), dict(members or {}, __doc__=doc))
+    return swagger.model(**options)(cls) if decorate else cls
+
+
+def make_handler(index, base=None, decorate=True):
+    """
+    Returns Handler<index>, a subclass of base (RequestHandler by default),
+    with get and put operations over Model<index>, which it keeps as model
+    since models are registered weakly. With decorate=False neither is
+    documented and there is no model.
+    """
+    from tornado.web import RequestHandler
+    from tornado_swagger import swagger
+
+    def __init__(self, name, child=None, size=0):
+        pass
+
+    def get(self, arg):
+        pass
+
+    def put(self, arg):
+        pass
+    get.__doc__ = GET_DOC % index
+    put.__doc__ = PUT_DOC % index
+    members = {'get': get, 'put': put}
+    if decorate:
+        members.update({
+            'get': swagger.operation(nickname='get%d' % index)(get),
+            'put': swagger.operation(nickname='put%d' % index)(put),
+            'model': make_model('Model%d' % index, {'__init__': __init__}, MODEL_DOC % index),
+        })
+    return type('Handler%d' % index, (base or RequestHandler,), members)
+
+
+def make_app(handlers):
+    """
+    Returns an application of handlers documented handlers, their docstrings
+    left to parse (lazy_parse).
+    """
+    from tornado.web import RequestHandler
+    from tornado_swagger import swagger
+
+    swagger.docs(lazy_parse=True)
+
+    class Base(RequestHandler):
+        pass
+
+    return swagger.Application([(r'/items%d/([^/]+)' % i, make_handler(i, Base)) for i in range(handlers)])
+
+
+def generate_module(path, handlers, operations, models):
+    """
+    Writes generated_api.py: models Model0 .. Model<models - 1>, each nesting
+    the next, and handlers with operations methods each, which return or take
+    the models in turn.
+    """
+    with open(path, 'w') as f:
+        f.write('from tornado.web import RequestHandler\n')
+        f.write('from tornado_swagger import swagger\n')
+        for index in range(models):
+            nested = index + 1 < models
+            f.write(MODEL_TEMPLATE % {
+                'index': index,
+                'nested': NESTED_DOC % {'child': index + 1} if nested else '',
+                'nested_args': ', child=None, children=None' if nested else '',
+            })
+        for index in range(handlers):
+            f.write('\n\nclass Handler%d(RequestHandler):' % index)
+            for number, method in enumerate(METHODS[:operations]):
+                values = {'index': index, 'method': method, 'model': (index * operations + number) % models}
+                if method == 'get':
+                    f.write(GET_TEMPLATE % values)
+                elif method == 'delete':
+                    f.write(DELETE_TEMPLATE % values)
+                else:
+                    f.write(BODY_TEMPLATE % values)
+        f.write('\n\nhandlers = [(r"/items%%d/([^/]+)" %% index, globals()["Handler%%d" %% index]) for index in range(%d)]\n'
+                % handlers)
+
+
+def peak_rss_kb():
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure(code, repeat=5):
+    """
+    Runs code in repeat fresh processes, each printing a json object of
+    measures on its last line, and keeps the best of each: the highest of
+    the rates (named ..._per_second), the lowest of the others.
+    """
+    best = {}
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-B', '-c', code])
+        for name, value in json.loads(output.decode().strip().splitlines()[-1]).items():
+            if name not in best:
+                best[name] = value
+            else:
+                best[name] = max(best[name], value) if name.endswith('_per_second') else min(best[name], value)
+    return best
@@ -0,0 +1,92 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures the memory taken by serving /swagger/spec of an application with
+many documented handlers: serialized on the request, served from the cache,
+and streamed with stream_spec=True. Each case runs in a fresh process.
+
+Uses tracemalloc (Python 3.4+) to report the peak of the allocations made
+while answering; elsewhere falls back to the growth of the peak rss, which
+is coarser.
+
+    python benchmarks/memory.py [handlers]
+"""
+import os
+import sys
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import peak_rss_kb
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+__author__ = 'serena'
+
+CASES = (
+    ('cold', 'serialized on the request'),
+    ('cached', 'served from the cache'),
+    ('stream', 'streamed (stream_spec)'),
+)
+
+
+def fetch(url):
+    """
+    Gets url and returns the size of the body, which is counted and dropped.
+    """
+    from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+    from tornado.ioloop import IOLoop
+
+    received = []
+    request = HTTPRequest(url, decompress_response=False,
+                          streaming_callback=lambda chunk: received.append(len(chunk)))
+    IOLoop.current().run_sync(lambda: AsyncHTTPClient().fetch(request))
+    return sum(received)
+
+
+def run(handlers, case):
+    from tornado.httpserver import HTTPServer
+    from tornado.testing import bind_unused_port
+    from tornado_swagger import swagger
+    from tornado_swagger.settings import default_settings
+    from helpers import make_app
+
+    app = make_app(handlers)
+    swagger.docs(stream_spec=case == 'stream')
+    swagger.warm_up(app)
+    sock, port = bind_unused_port()
+    HTTPServer(app).add_sockets([sock])
+    url = 'http://localhost:%d%sspec' % (port, default_settings['swagger_prefix'].rstrip('/') + '/')
+    if case == 'cached':
+        fetch(url)
+
+    if tracemalloc:
+        tracemalloc.start()
+        size = fetch(url)
+        current, peak = tracemalloc.get_traced_memory()
+        used = peak // 1024
+    else:
+        before = peak_rss_kb()
+        size = fetch(url)
+        used = peak_rss_kb() - before
+    print('%d %d' % (size // 1024, used))
+
+
+def main():
+    handlers = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print('%d handlers, %s in kB' % (handlers, 'tracemalloc peak' if tracemalloc else 'peak rss growth'))
+    print('%-28s %10s %10s' % ('', 'spec', 'memory'))
+    for case, title in CASES:
+        output = subprocess.check_output([sys.executable, __file__, '--run', str(handlers), case])
+        size, used = output.split()
+        print('%-28s %10s %10s' % (title, size.decode(), used.decode()))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--run']:
+        run(int(sys.argv[2]), sys.argv[3])
+    else:
+        main()
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures the memory retained by the metadata of an application with many
+documented handlers (two operations and a model each), once decorated and
+once every docstring is parsed: the size of the operation and model objects
+and of everything they hold but the handler functions and model classes, and
+the memory allocated meanwhile, from tracemalloc (Python 3.4+) or else from
+the growth of the peak rss, which is coarser. Each case runs in a fresh process.
+
+    python benchmarks/metadata.py [handlers]
+"""
+import os
+import gc
+import sys
+import types
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import peak_rss_kb
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+__author__ = 'serena'
+
+
+def used_kb():
+    gc.collect()
+    if tracemalloc:
+        return tracemalloc.get_traced_memory()[0] // 1024
+    return peak_rss_kb()
+
+
+def deep_size(roots):
+    """
+    Returns the size in bytes of roots and of the objects they refer to,
+    not counting functions, classes and modules.
+    """
+    skip = (type, types.ClassType, types.FunctionType, types.ModuleType) if hasattr(types, 'ClassType') \
+        else (type, types.FunctionType, types.ModuleType)
+    seen = set()
+    pending = list(roots)
+    size = 0
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, skip):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        pending.extend(gc.get_referents(obj))
+    return size
+
+
+def run(handlers, parse):
+    from tornado_swagger import swagger
+    from helpers import make_app
+
+    if tracemalloc:
+        tracemalloc.start()
+    before = used_kb()
+    app = make_app(handlers)
+    if parse:
+        swagger.warm_up()
+    used = used_kb() - before
+    metadata = deep_size(obj for obj in gc.get_objects() if isinstance(obj, swagger.DocParser))
+    print('%d %d' % (metadata // 1024, used))
+
+
+def main():
+    handlers = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print('%d handlers, in kB' % handlers)
+    print('%-12s %10s %14s %22s' % ('', 'metadata', 'per handler', 'tracemalloc' if tracemalloc else 'peak rss growth'))
+    for parse in (False, True):
+        output = subprocess.check_output([sys.executable, __file__, '--run', str(handlers), str(int(parse))])
+        metadata, used = [int(value) for value in output.split()]
+        print('%-12s %10d %14.2f %22d' % ('parsed' if parse else 'decorated', metadata,
+                                          float(metadata) / handlers, used))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--run']:
+        run(int(sys.argv[2]), bool(int(sys.argv[3])))
+    else:
+        main()
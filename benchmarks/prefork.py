@@ -0,0 +1,107 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Forks workers from an application with many documented handlers and reports
+the memory each of them owns (private dirty) after serving its first
+/swagger/spec, after the worker made as many objects as the parent has, which
+makes the garbage collector run a full collection unless warm_up(freeze=True)
+put it off, and after an explicit gc.collect(). The specs are built in each
+worker, or by warm_up() in the parent, with and without freezing the
+collector. Linux only (reads /proc).
+
+    python benchmarks/prefork.py [handlers] [workers]
+"""
+import gc
+import os
+import sys
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import make_app
+
+__author__ = 'serena'
+
+
+def memory_kb():
+    """
+    Returns (rss, private_dirty) of the current process in kB.
+    """
+    usage = {'Rss': 0, 'Private_Dirty': 0}
+    path = '/proc/self/smaps_rollup' if os.path.exists('/proc/self/smaps_rollup') else '/proc/self/smaps'
+    with open(path) as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in usage:
+                usage[name] += int(value.split()[0])
+    return usage['Rss'], usage['Private_Dirty']
+
+
+CASES = (
+    ('built in each worker', 'cold'),
+    ('warm_up()', 'warm'),
+    ('warm_up(freeze=True)', 'frozen'),
+)
+
+
+def grow(count):
+    """
+    Keeps count new objects, as a worker accumulating state does: as many as
+    the parent has make the collector start a full collection under the
+    default thresholds. count is taken before forking, as gc.get_objects()
+    writes to every object.
+    """
+    return [[] for _ in range(count)]
+
+
+def run(handlers, workers, case):
+    from tornado_swagger import swagger
+    from tornado_swagger.settings import default_settings
+    from tornado_swagger.views import SwaggerApiHandler
+
+    app = make_app(handlers)
+    if case != 'cold':
+        swagger.warm_up(app, ['http://localhost'], freeze=case == 'frozen')
+
+    read_fd, write_fd = os.pipe()
+    children = []
+    count = len(gc.get_objects())
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            SwaggerApiHandler.cached_spec(app, default_settings['api_version'],
+                                          default_settings['exclude_namespaces'], 'http://localhost', None, 'localhost')
+            served = memory_kb()[1]
+            kept = grow(count)
+            grown = memory_kb()[1]
+            gc.collect()
+            collected = memory_kb()[1]
+            os.write(write_fd, ('%d %d %d\n' % (served, grown, collected)).encode())
+            del kept
+            os._exit(0)
+        children.append(pid)
+    os.close(write_fd)
+    for pid in children:
+        os.waitpid(pid, 0)
+    with os.fdopen(read_fd) as f:
+        results = [[int(v) for v in line.split()] for line in f]
+    print(' '.join(str(sum(result[i] for result in results) // workers) for i in range(3)))
+
+
+def main():
+    handlers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print('%d handlers, %d workers, per-worker private dirty memory in kB' % (handlers, workers))
+    print('%-24s %10s %10s %14s' % ('', 'served', 'grown', 'gc.collect()'))
+    for title, case in CASES:
+        output = subprocess.check_output([sys.executable, __file__, '--run', str(handlers), str(workers), case])
+        served, grown, collected = output.split()
+        print('%-24s %10s %10s %14s' % (title, served.decode(), grown.decode(), collected.decode()))
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--run']:
+        run(int(sys.argv[2]), int(sys.argv[3]), sys.argv[4])
+    else:
+        main()
@@ -0,0 +1,113 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures converting a list of models, each with a nested model and a list of
+them, to dicts and back: hand-written methods, as in example/basic.py, against
+the ones generated by @swagger.model(serializers=True), with and without
+slots=True, and the memory each instance takes.
+
+    python benchmarks/serializers.py [objects]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import make_model
+
+__author__ = 'serena'
+
+ITEM_DOC = """
+    @ptype size: L{%(size)s}
+    @ptype parts: C{list} of L{%(size)s}
+    @ptype price: L{number}
+"""
+
+
+def make_models(suffix, **options):
+    class Size(object):
+        def __init__(self, width, height):
+            self.width = width
+            self.height = height
+
+        def format_http(self):
+            return {'width': self.width, 'height': self.height}
+
+        @staticmethod
+        def size_from_dict(data):
+            if data is None:
+                return None
+            return Size(data.get('width'), data.get('height'))
+
+    class Item(object):
+        def __init__(self, name, size, parts=None, price=0, label=None):
+            self.name = name
+            self.size = size
+            self.parts = parts
+            self.price = price
+            self.label = label
+
+        def format_http(self):
+            return {
+                'name': self.name,
+                'size': self.size.format_http() if self.size is not None else None,
+                'parts': [part.format_http() for part in self.parts] if self.parts is not None else None,
+                'price': self.price,
+                'label': self.label,
+            }
+
+        @staticmethod
+        def item_from_dict(data):
+            if data is None:
+                return None
+            parts = data.get('parts')
+            return Item(data.get('name'), Size.size_from_dict(data.get('size')),
+                        [Size.size_from_dict(part) for part in parts] if parts is not None else None,
+                        data.get('price', 0), data.get('label'))
+
+    # distinct names for the registry, and the docstring naming the nested model
+    Size = make_model('Size' + suffix, members(Size), None, bool(options), **options)
+    Item = make_model('Item' + suffix, members(Item), ITEM_DOC % {'size': Size.__name__}, bool(options), **options)
+    return Size, Item
+
+
+def members(cls):
+    return dict((name, member) for name, member in vars(cls).items() if name not in ('__dict__', '__weakref__'))
+
+
+def instance_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main():
+    objects = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    cases = []
+    for title, options in (('hand-written', {}),
+                           ('generated', {'serializers': True}),
+                           ('generated, slots', {'serializers': True, 'slots': True})):
+        Size, Item = make_models(str(len(cases)), **options)
+        items = [Item('item%d' % i, Size(i, i + 1), [Size(1, 2), Size(3, 4)], i * 1.5) for i in range(objects)]
+        if options:
+            Item.from_dict(None)  # generates both
+            to_dict, from_dict = Item.to_dict, Item.from_dict
+        else:
+            to_dict, from_dict = Item.format_http, Item.item_from_dict
+        dicts = [to_dict(item) for item in items]
+        assert [to_dict(from_dict(data)) for data in dicts] == dicts
+        cases.append((title, items, dicts, to_dict, from_dict))
+    assert cases[0][2] == cases[1][2] == cases[2][2]
+
+    print('%d items, each with 3 nested models, in ms' % objects)
+    print('%-20s %10s %10s %18s' % ('', 'to_dict', 'from_dict', 'bytes per object'))
+    for title, items, dicts, to_dict, from_dict in cases:
+        dump = min(timeit.repeat(lambda: [to_dict(item) for item in items], number=1, repeat=9))
+        load = min(timeit.repeat(lambda: [from_dict(data) for data in dicts], number=1, repeat=9))
+        print('%-20s %10.1f %10.1f %18d' % (title, dump * 1000, load * 1000, instance_size(items[0])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures the import time of a module with 1,000 decorated operations,
+with docstrings parsed at decoration time, with lazy_parse, and with the
+parse results read from a parse_cache directory written by a previous run.
+
+    python benchmarks/startup.py [operations]
+"""
+import os
+import sys
+import shutil
+import tempfile
+from helpers import ROOT, generate_module, measure
+
+__author__ = 'serena'
+
+MEASURE = '''
+import sys, json, time
+sys.path[:0] = [%(root)r, %(module_dir)r]
+from benchmarks.helpers import peak_rss_kb
+from tornado_swagger import swagger
+swagger.docs(lazy_parse=%(lazy)s, parse_cache=%(parse_cache)r)
+start = time.time()
+import generated_api
+results = {'import_ms': round((time.time() - start) * 1000, 3)}
+if %(lazy)s:
+    start = time.time()
+    swagger.warm_up()
+    results['warm_up_ms'] = round((time.time() - start) * 1000, 3)
+results['peak_rss_kb'] = peak_rss_kb()
+print(json.dumps(results))
+'''
+
+
+def measure_import(module_dir, lazy, parse_cache=None, repeat=5):
+    """
+    Imports generated_api from module_dir in repeat fresh processes and
+    returns the best import_ms, warm_up_ms with lazy, and peak_rss_kb.
+    """
+    return measure(MEASURE % {'root': ROOT, 'module_dir': module_dir, 'lazy': lazy, 'parse_cache': parse_cache},
+                   repeat)
+
+
+def main():
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    module_dir = tempfile.mkdtemp()
+    try:
+        generate_module(os.path.join(module_dir, 'generated_api.py'), operations // 2, 2, 10)
+        eager = measure_import(module_dir, False)['import_ms']
+        lazy = measure_import(module_dir, True)['import_ms']
+        # the first run writes the cache, the others read it
+        cached = measure_import(module_dir, False, os.path.join(module_dir, 'parse_cache'))['import_ms']
+    finally:
+        shutil.rmtree(module_dir)
+    print('%d operations' % operations)
+    print('eager import:  %.1f ms' % eager)
+    print('lazy import:   %.1f ms (%.1fx faster)' % (lazy, eager / lazy))
+    print('parse_cache:   %.1f ms (%.1fx faster)' % (cached, eager / cached))
+
+
+if __name__ == "__main__":
+    main()
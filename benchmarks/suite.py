@@ -0,0 +1,203 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Generates a module with N handlers of M documented operations each, over a
+chain of K nested models, and measures, each in a fresh process:
+
+    import        decorating and parsing the module (eager, and lazy then warm_up),
+                  with measure_import() of startup.py
+    discovery     SwaggerApiHandler.find_api over the application, with timed()
+                  of discovery.py
+    spec          /swagger/spec through an in-process server: cold latency, then
+                  latency percentiles and throughput of the cached spec
+    memory        the peak rss of each of those processes
+
+The results are written as json, and compared with a previous run:
+
+    python benchmarks/suite.py --handlers 500 --output before.json
+    python benchmarks/suite.py --handlers 500 --output after.json --compare before.json
+"""
+import os
+import time
+import json
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from helpers import ROOT, METHODS, generate_module, measure, peak_rss_kb
+from startup import measure_import
+
+__author__ = 'serena'
+
+MEASURE = '''
+import sys
+sys.path[:0] = [%(root)r, %(module_dir)r]
+from benchmarks import suite
+suite.run(%(phase)r, %(params)r)
+'''
+
+
+def percentile(timings, q):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def run(phase, params):
+    """
+    Runs the discovery or the spec phase in this process and prints its
+    results as json.
+    """
+    from tornado_swagger import swagger
+    import generated_api
+
+    results = {}
+    if phase == 'discovery':
+        from tornado_swagger.views import SwaggerApiHandler
+        from discovery import timed
+
+        app = swagger.Application(generated_api.handlers)
+        timings = []
+        for _ in range(params['repeat']):
+            count, elapsed = timed(SwaggerApiHandler.find_api, app.handlers)
+            timings.append(elapsed)
+        assert count == params['handlers']
+        results.update({'find_api_ms': ms(min(timings)), 'find_api_first_ms': ms(timings[0])})
+    elif phase == 'spec':
+        results.update(serve(swagger.Application(generated_api.handlers), params))
+    results['peak_rss_kb'] = peak_rss_kb()
+    print(json.dumps(results))
+
+
+def serve(app, params):
+    """
+    Serves app on a local port and fetches its /swagger/spec on the same
+    IOLoop, so the timings include the client.
+    """
+    from tornado import gen
+    from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+    from tornado.httpserver import HTTPServer
+    from tornado.ioloop import IOLoop
+    from tornado.testing import bind_unused_port
+    from tornado_swagger.settings import default_settings
+
+    sock, port = bind_unused_port()
+    HTTPServer(app).add_sockets([sock])
+    url = 'http://localhost:%d%sspec' % (port, default_settings['swagger_prefix'].rstrip('/') + '/')
+    client = AsyncHTTPClient(max_clients=params['concurrency'])
+    io_loop = IOLoop.current()
+    results = {}
+
+    @gen.coroutine
+    def fetch():
+        start = time.time()
+        response = yield client.fetch(HTTPRequest(url, decompress_response=False))
+        raise gen.Return((time.time() - start, len(response.body)))
+
+    @gen.coroutine
+    def worker(count, timings):
+        for _ in range(count):
+            elapsed, _ = yield fetch()
+            timings.append(elapsed)
+
+    elapsed, size = io_loop.run_sync(fetch)
+    results.update({'spec_kb': size // 1024, 'cold_ms': ms(elapsed)})
+
+    timings = []
+    io_loop.run_sync(lambda: worker(params['requests'], timings))
+    results.update({'p50_ms': ms(percentile(timings, 0.5)), 'p99_ms': ms(percentile(timings, 0.99))})
+
+    timings = []
+    per_worker = max(1, params['requests'] // params['concurrency'])
+    start = time.time()
+    io_loop.run_sync(lambda: [worker(per_worker, timings) for _ in range(params['concurrency'])])
+    results['requests_per_second'] = round(len(timings) / (time.time() - start), 1)
+    return results
+
+
+def git_revision():
+    try:
+        with open(os.devnull, 'w') as devnull:
+            return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                           stderr=devnull).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """
+    Prints each measure of report against the one in baseline; for all but
+    requests_per_second, lower is better.
+    """
+    if baseline['parameters'] != report['parameters']:
+        print('warning: the baseline was run with %s' % json.dumps(baseline['parameters'], sort_keys=True))
+    print('%-36s %12s %12s %9s' % ('', 'baseline', 'current', 'change'))
+    for phase in sorted(report['results']):
+        for name, value in sorted(report['results'][phase].items()):
+            before = baseline['results'].get(phase, {}).get(name)
+            if not before:
+                continue
+            change = (value - before) * 100.0 / before
+            worse = change < 0 if name == 'requests_per_second' else change > 0
+            print('%-36s %12s %12s %+8.1f%%%s' % ('%s.%s' % (phase, name), before, value, change,
+                                                 ' *' if worse and abs(change) >= 10 else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='tornado_swagger benchmark suite')
+    parser.add_argument('--handlers', type=int, default=200, help='documented handlers (N)')
+    parser.add_argument('--operations', type=int, default=3, choices=range(1, len(METHODS) + 1),
+                        help='operations per handler (M)')
+    parser.add_argument('--models', type=int, default=10, help='nested models (K)')
+    parser.add_argument('--requests', type=int, default=200, help='requests of the cached spec')
+    parser.add_argument('--concurrency', type=int, default=10, help='concurrent requests for the throughput')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each phase, the best is kept')
+    parser.add_argument('--output', help='file to write the results to, json')
+    parser.add_argument('--compare', help='results of a previous run to compare with')
+    args = parser.parse_args()
+
+    params = {'handlers': args.handlers, 'operations': args.operations, 'models': args.models,
+              'requests': args.requests, 'concurrency': args.concurrency, 'repeat': args.repeat}
+    module_dir = tempfile.mkdtemp()
+    try:
+        generate_module(os.path.join(module_dir, 'generated_api.py'), args.handlers, args.operations, args.models)
+        results = {
+            'import': measure_import(module_dir, False, repeat=args.repeat),
+            'import_lazy': measure_import(module_dir, True, repeat=args.repeat),
+        }
+        for phase in ('discovery', 'spec'):
+            results[phase] = measure(MEASURE % {'root': ROOT, 'module_dir': module_dir, 'phase': phase,
+                                                'params': params}, args.repeat)
+    finally:
+        shutil.rmtree(module_dir)
+
+    import tornado
+    report = {
+        'parameters': params,
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'tornado': tornado.version,
+            'platform': platform.platform(),
+            'revision': git_revision(),
+        },
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }
+    data = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(data + '\n')
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Measures the validation of a request with path, query and body parameters,
+the body being a model with a nested model and a list of them: the validators
+compiled with validate_requests=True against interpreting the parameters and
+properties of the operation for each request.
+
+    python benchmarks/validation.py [requests]
+"""
+import os
+import sys
+import json
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+__author__ = 'serena'
+
+INTEGER_TYPES = ('integer', 'int', 'long', 'int32', 'int64')
+NUMBER_TYPES = ('number', 'float', 'double')
+BOOLEAN_TYPES = ('boolean', 'bool')
+
+
+def make_operation():
+    from tornado_swagger import swagger
+
+    @swagger.model()
+    class Size(object):
+        """
+        @ptype width: L{integer}
+        @ptype height: L{integer}
+        """
+        def __init__(self, width, height):
+            pass
+
+    @swagger.model()
+    class Item(object):
+        """
+        @ptype size: L{Size}
+        @ptype parts: C{list} of L{Size}
+        @ptype price: L{number}
+        @ptype stock: L{integer}
+        """
+        def __init__(self, name, size, parts=None, price=0, stock=0, label=None):
+            pass
+
+    def put(self, shop_id, item_id):
+        """
+        @type shop_id: L{integer}
+        @param body: the item
+        @type body: L{Item}
+        @in body: body
+        @required body: True
+        @param dry_run: only check the item
+        @type dry_run: L{boolean}
+        @in dry_run: query
+        @param version: expected version
+        @type version: L{integer}
+        @in version: query
+        @required version: True
+        """
+    api = swagger.operation(nickname='put')(put).rest_api
+    return api, (Size, Item)
+
+
+def naive_value(data_type, value, path):
+    from tornado_swagger.registry import model_registry
+
+    model = model_registry.get(data_type)
+    if model is not None:
+        if not isinstance(value, dict):
+            return [(path, 'must be an object')]
+        errors = []
+        for name in model.required:
+            if value.get(name) is None:
+                errors.append(('%s.%s' % (path, name), 'is required'))
+        for name, prop in model.properties.items():
+            if value.get(name) is None:
+                continue
+            errors.extend(naive_value(prop.get('type'), value[name], '%s.%s' % (path, name)))
+            if 'items' in prop and isinstance(value[name], list):
+                for index, item in enumerate(value[name]):
+                    errors.extend(naive_value(prop['items'].get('type'), item, '%s.%s[%d]' % (path, name, index)))
+        return errors
+    if data_type in INTEGER_TYPES and not isinstance(value, (int, long)):
+        return [(path, 'must be an integer')]
+    if data_type in NUMBER_TYPES and not isinstance(value, (int, long, float)):
+        return [(path, 'must be a number')]
+    if data_type in BOOLEAN_TYPES and not isinstance(value, bool):
+        return [(path, 'must be true or false')]
+    return []
+
+
+def naive(api, handler, args, kwds):
+    """
+    Validates the request of handler by walking the spec of api.
+    """
+    request = handler.request
+    values = {}
+    errors = []
+    for param in api.params:
+        name = param['name']
+        location = param.get('paramType')
+        data_type = param.get('dataType')
+        if location == 'path':
+            value = args[list(api.func_args).index(name)]
+        elif location == 'query':
+            value = request.query_arguments.get(name)
+            value = value[-1] if value else None
+        elif location == 'body':
+            value = request.body or None
+        else:
+            continue
+        if value is None:
+            if param.get('required'):
+                errors.append({'name': name, 'in': location, 'message': 'is required'})
+            continue
+        try:
+            if location != 'body' and isinstance(value, bytes):
+                value = value.decode('utf-8')
+            if location == 'body':
+                value = json.loads(value)
+                errors.extend({'name': path, 'in': location, 'message': message}
+                              for path, message in naive_value(data_type, value, name))
+            elif data_type in INTEGER_TYPES:
+                value = int(value)
+            elif data_type in NUMBER_TYPES:
+                value = float(value)
+            elif data_type in BOOLEAN_TYPES:
+                value = {'true': True, '1': True, 'false': False, '0': False}[value.lower()]
+        except (ValueError, KeyError):
+            errors.append({'name': name, 'in': location, 'message': 'is invalid'})
+            continue
+        values[name] = value
+    handler.validated = values
+    return errors
+
+
+class Handler(object):
+    def __init__(self, request):
+        self.request = request
+        self.validated = None
+
+
+def main():
+    from tornado.httputil import HTTPServerRequest
+    from tornado_swagger.validation import compile_operation
+
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    api, models = make_operation()
+    body = json.dumps({'name': 'chair', 'size': {'width': 40, 'height': 90}, 'price': 25.5, 'stock': 3,
+                       'parts': [{'width': 40, 'height': 45}, {'width': 40, 'height': 5}]})
+    request = HTTPServerRequest('PUT', '/shops/7/items/chair?version=3&dry_run=false', body=body)
+    request._parse_body()
+    handler = Handler(request)
+    args = (u'7', u'chair')
+
+    validate = compile_operation(api)
+    assert validate(handler, args, {}) is not None
+    compiled = dict(handler.validated)
+    assert not naive(api, handler, args, {}) and handler.validated == compiled
+
+    print('%d requests of PUT /shops/{shop_id}/items/{item_id}' % requests)
+    for title, func in (('interpreted per request', lambda: naive(api, handler, args, {})),
+                        ('compiled validators', lambda: validate(handler, args, {}))):
+        elapsed = min(timeit.repeat(func, number=requests, repeat=3))
+        print('%-26s %8.2f us per request' % (title, elapsed * 1e6 / requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@ class PropertySubclass:
         self.sub_property = sub_property
 
 
-@swagger.model()
+@swagger.model(serializers=True)
 class Item:
     """
         @description:
@@ -36,28 +36,6 @@ class Item:
         self.property3 = property3
         self.property4 = property4
 
-    def format_http(self):
-        return {
-            "property1": self.property1,
-            "property2": self.property2,
-            "property3": self.property3,
-            "property4": self.property4,
-        }
-
-    @staticmethod
-    def item_from_dict(item_dict):
-
-        if item_dict is None:
-            return None
-
-        t = Item(None)
-        t.property1 = item_dict.get('property1')
-        t.property2 = item_dict.get('property2')
-        t.property3 = item_dict.get('property3')
-        t.property4 = item_dict.get('property4')
-
-        return t
-
     @classmethod
     def test_classmethod(cls):
         pass
@@ -107,10 +85,13 @@ class ItemNoParamHandler(GenericApiHandler):
             @raise 400: invalid input
         """
         property1 = self.json_args.get('property1')
-        item = Item.item_from_dict(self.json_args)
+        try:
+            item = Item.from_dict(self.json_args)
+        except ValueError as error:
+            raise HTTPError(HTTP_BAD_REQUEST, str(error))
         items[property1] = item
         Item.test_classmethod()
-        self.finish_request(item.format_http())
+        self.finish_request(item.to_dict())
 
     @swagger.operation(nickname='list')
     def get(self):
@@ -119,7 +100,7 @@ class ItemNoParamHandler(GenericApiHandler):
         """
         res = []
         for key, value in items.iteritems():
-            res.append(value.format_http())
+            res.append(value.to_dict())
         self.finish_request(res)
 
     def options(self):
@@ -140,7 +121,7 @@ class ItemHandler(GenericApiHandler):
 
                 This will be added to the Implementation Notes.It lets you put very long text in your api.
         """
-        self.finish_request(items[arg].format_http())
+        self.finish_request(items[arg].to_dict())
 
     @swagger.operation(nickname='delete')
     def delete(self, arg):
@@ -190,12 +171,12 @@ class ItemQueryHandler(GenericApiHandler):
         if property1 is None:
             for key, value in items.iteritems():
                 if property2 is None:
-                    res.append(value.format_http())
+                    res.append(value.to_dict())
                 elif value.property2 == property2:
-                    res.append(value.format_http())
+                    res.append(value.to_dict())
         elif items.has_key(property1):
             if items.get(property1).property2 == property2:
-                res.append(items.get(property1).format_http())
+                res.append(items.get(property1).to_dict())
 
         self.finish_request(res)
 
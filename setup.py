@@ -25,7 +25,11 @@ setup(name='tornado-swagger',
       license='MIT',
       long_description=long_description,
       install_requires=[
-        'tornado>=3.1,<=4.3',
-        'epydoc>=0.3.1'
+        'tornado>=4.1,<=4.3',
       ],
+      extras_require={
+        'epydoc': ['epydoc>=0.3.1'],
+        'msgpack': ['msgpack'],
+        'cbor': ['cbor2'],
+      },
 )
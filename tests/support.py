@@ -0,0 +1,64 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import tornado.web
+from tornado.testing import AsyncHTTPTestCase
+from tornado_swagger import swagger
+from tornado_swagger.settings import default_settings
+from tornado_swagger.cache import spec_cache
+
+__author__ = 'serena'
+
+
+class ItemHandler(tornado.web.RequestHandler):
+    @swagger.operation(nickname='get_item')
+    def get(self, item_id):
+        """
+            @description: get an item
+        """
+
+
+class SwaggerTestCase(AsyncHTTPTestCase):
+    """
+    Restores the settings and empties the spec cache around each test, since
+    both are shared by the whole process. Serves ItemHandler unless get_app
+    is overridden.
+    """
+    def setUp(self):
+        self.saved_settings = dict(default_settings)
+        spec_cache.invalidate()
+        super(SwaggerTestCase, self).setUp()
+
+    def tearDown(self):
+        super(SwaggerTestCase, self).tearDown()
+        default_settings.clear()
+        default_settings.update(self.saved_settings)
+        spec_cache.invalidate()
+
+    def get_app(self):
+        return swagger.Application([(r'/items/([^/]+)', ItemHandler)])
+
+    def patch(self, owner, name, value):
+        original = owner.__dict__[name]
+        setattr(owner, name, value)
+        self.addCleanup(setattr, owner, name, original)
+
+    def count_calls(self, owner, name, wrap=staticmethod):
+        """
+        Replaces the static or class method name of owner by one counting its
+        calls in the returned list.
+        """
+        calls = []
+        func = getattr(owner, name)
+
+        def counted(*args, **kwds):
+            calls.append(args)
+            return func(*args, **kwds)
+        self.patch(owner, name, wrap(lambda *args, **kwds: counted(*args[1:], **kwds)) if wrap is classmethod
+                   else wrap(counted))
+        return calls
+
+    def fetch_json(self, path, **kwds):
+        response = self.fetch(path, **kwds)
+        self.assertEqual(response.code, 200)
+        return response, json.loads(response.body)
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import gc
+import time
+import json
+import unittest
+import tornado.web
+from tornado import gen
+from tornado.httpclient import AsyncHTTPClient
+from tornado.testing import gen_test
+from tornado_swagger import swagger
+from tornado_swagger.registry import ModelRegistry, model_registry
+from tornado_swagger.views import SwaggerApiHandler, executor
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+
+class LateHandler(tornado.web.RequestHandler):
+    @swagger.operation(nickname='get_late')
+    def get(self):
+        """
+            @description: added while a spec is being built
+        """
+
+
+@unittest.skipIf(executor is None, 'specs are built inline without the futures package')
+class BuildOnceTest(SwaggerTestCase):
+    def slow_down(self, name, delay):
+        """
+        Makes the static method name of SwaggerApiHandler, which runs on the
+        executor, take delay seconds, and returns the list of its calls.
+        """
+        calls = []
+        func = getattr(SwaggerApiHandler, name)
+
+        def slow(*args, **kwds):
+            calls.append(args)
+            time.sleep(delay)
+            return func(*args, **kwds)
+        self.patch(SwaggerApiHandler, name, staticmethod(slow))
+        return calls
+
+    @gen_test(timeout=10)
+    def test_concurrent_requests_share_one_build(self):
+        calls = self.count_calls(SwaggerApiHandler, 'spec_document', classmethod)
+        self.slow_down('find_api', 0.2)
+        client = AsyncHTTPClient(force_instance=True, max_clients=100)
+        responses = yield [client.fetch(self.get_url('/swagger/spec')) for _ in range(100)]
+        client.close()
+        self.assertEqual(set(response.code for response in responses), set([200]))
+        self.assertEqual(len(set(response.body for response in responses)), 1)
+        self.assertEqual(len(calls), 1)
+
+    @gen_test(timeout=10)
+    def test_handlers_added_during_a_build_are_documented(self):
+        self.slow_down('find_api', 0.3)
+        client = AsyncHTTPClient(force_instance=True)
+        building = client.fetch(self.get_url('/swagger/spec'))
+        yield gen.sleep(0.1)
+        self._app.add_handlers(r'.*$', [(r'/zzz', LateHandler)])
+        yield building
+
+        response = yield client.fetch(self.get_url('/swagger/spec'))
+        client.close()
+        paths = [api['path'] for api in json.loads(response.body)['apis']]
+        self.assertIn('/zzz', paths)
+        self.assertIn('/items/{item_id}', paths)
+
+    @gen_test(timeout=10)
+    def test_requests_after_an_invalidation_do_not_join_the_outdated_build(self):
+        self.slow_down('find_api', 0.3)
+        client = AsyncHTTPClient(force_instance=True)
+        building = client.fetch(self.get_url('/swagger/spec'))
+        yield gen.sleep(0.1)
+        self._app.add_handlers(r'.*$', [(r'/zzz', LateHandler)])
+        response = yield client.fetch(self.get_url('/swagger/spec'))
+        yield building
+        client.close()
+        self.assertIn('/zzz', [api['path'] for api in json.loads(response.body)['apis']])
+
+
+def make_model(name='Widget', doc=None):
+    """
+    Returns a new class named name, decorated with @swagger.model.
+    """
+    return swagger.model()(type(name, (object,), {'__doc__': doc, '__init__': lambda self, size: None}))
+
+
+class ModelRegistryTest(unittest.TestCase):
+    def test_registered_once(self):
+        registry = ModelRegistry()
+        cls = make_model()
+        self.assertTrue(registry.add(cls.rest_model))
+        self.assertFalse(registry.add(cls.rest_model))
+        self.assertEqual(len(registry), 1)
+        self.assertIs(registry.get('Widget'), cls.rest_model)
+
+        # decorating it again, as a repeated import does, adds nothing
+        registered = len(model_registry)
+        swagger.model()(cls)
+        self.assertEqual(len(model_registry), registered)
+
+        # a class reloaded under the same id replaces it
+        reloaded = make_model()
+        self.assertTrue(registry.add(reloaded.rest_model))
+        self.assertEqual(len(registry), 1)
+        self.assertIs(registry.get('Widget'), reloaded.rest_model)
+
+    def test_released_with_its_class(self):
+        registry = ModelRegistry()
+        cls = make_model('Transient')
+        registry.add(cls.rest_model)
+        self.assertIsNotNone(model_registry.get('Transient'))
+        del cls
+        gc.collect()
+        self.assertIsNone(registry.get('Transient'))
+        self.assertEqual(len(registry), 0)
+        self.assertIsNone(model_registry.get('Transient'))
+
+    def test_reachable(self):
+        classes = [make_model('Leaf'), make_model('Branch', '@ptype leaves: C{list} of L{Leaf}'),
+                   make_model('Unused')]
+        reachable = model_registry.reachable(['Branch', 'Missing'])
+        self.assertEqual(sorted(model_id for model_id, model in reachable.items() if model), ['Branch', 'Leaf'])
+        self.assertIs(reachable['Leaf'], classes[0].rest_model)
+        self.assertIsNone(reachable['Missing'])
+        self.assertNotIn('Unused', reachable)
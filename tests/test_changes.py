@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import tornado.web
+from tornado_swagger import swagger
+from tornado_swagger.cache import spec_cache
+from tornado_swagger.views import SwaggerApiHandler, model_tag, resource_tag
+from tests.support import SwaggerTestCase, ItemHandler
+
+__author__ = 'serena'
+
+
+@swagger.model()
+class Gadget(object):
+    def __init__(self, name):
+        self.name = name
+
+
+class GadgetHandler(tornado.web.RequestHandler):
+    @swagger.operation(nickname='get_gadget')
+    def get(self, gadget_id):
+        """
+            @rtype: L{Gadget}
+        """
+
+
+class ChangesTest(SwaggerTestCase):
+    def get_app(self):
+        return swagger.Application([(r'/items/([^/]+)', ItemHandler), (r'/gadgets/([^/]+)', GadgetHandler)])
+
+    def changes(self, since):
+        _, changes = self.fetch_json('/swagger/changes?since=%d' % since)
+        return changes
+
+    def test_generation(self):
+        _, changes = self.fetch_json('/swagger/changes')
+        self.assertEqual(changes, {'generation': spec_cache.generation})
+        generation = changes['generation']
+        self.assertEqual(self.changes(generation), {'generation': generation, 'resources': [], 'models': []})
+
+    def test_changed_resources_and_models(self):
+        generation = spec_cache.generation
+        spec_cache.invalidate([resource_tag('gadgets'), resource_tag('elsewhere')])
+        spec_cache.invalidate([model_tag('Gadget'), model_tag('Stray')])
+        self.assertEqual(self.changes(generation), {'generation': generation + 2, 'resources': ['gadgets'],
+                                                    'models': ['Gadget']})
+        self.assertEqual(self.changes(generation + 1)['resources'], [])
+
+    def test_full_spec_not_built(self):
+        calls = self.count_calls(SwaggerApiHandler, 'spec_document', classmethod)
+        generation = spec_cache.generation
+        spec_cache.invalidate([model_tag('Gadget')])
+        self.assertEqual(self.changes(generation)['models'], ['Gadget'])
+        self.assertEqual(calls, [])
+
+    def test_too_old(self):
+        generation = spec_cache.generation
+        spec_cache.invalidate()
+        self.assertEqual(self.changes(generation), {'generation': generation + 1, 'resources': None,
+                                                    'models': None})
+
+    def test_bad_since(self):
+        self.assertEqual(self.fetch('/swagger/changes?since=abc').code, 400)
+
+
+class TagScopedInvalidationTest(SwaggerTestCase):
+    def get_app(self):
+        return swagger.Application([(r'/items/([^/]+)', ItemHandler), (r'/gadgets/([^/]+)', GadgetHandler)])
+
+    def test_only_tagged_specs_dropped(self):
+        builds = self.count_calls(SwaggerApiHandler, 'build_spec', classmethod)
+        for resource in ('items', 'gadgets'):
+            self.fetch_json('/swagger/spec/' + resource)
+        self.assertEqual(len(builds), 2)
+
+        spec_cache.invalidate([model_tag('Gadget')])
+        for resource in ('items', 'gadgets'):
+            self.fetch_json('/swagger/spec/' + resource)
+        self.assertEqual([args[-2] for args in builds[2:]], ['gadgets'])
+
+    def test_added_handlers_drop_their_resource(self):
+        self.fetch_json('/swagger/spec/items')
+        generation = spec_cache.generation
+        self._app.add_handlers(r'.*$', [(r'/gadgets/extra/([^/]+)', GadgetHandler)])
+        self.assertEqual(spec_cache.changed_since(generation), set([('handlers', None), resource_tag('gadgets')]))
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import gzip
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+from tornado_swagger import cache
+from tornado_swagger.compress import replace_file, precompress_static
+from tornado_swagger.views import executor
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+
+class CompressedSpecTest(SwaggerTestCase):
+    def record_threads(self):
+        threads = []
+
+        def compress(data, encoding):
+            threads.append(threading.current_thread())
+            return original(data, encoding)
+        original = cache.compress
+        self.patch(cache, 'compress', compress)
+        return threads
+
+    def test_gzipped_spec(self):
+        threads = self.record_threads()
+        plain = self.fetch('/swagger/spec')
+        response = self.fetch('/swagger/spec', headers={'Accept-Encoding': 'gzip'}, decompress_response=False)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(response.body)).read(), plain.body)
+        self.assertEqual(len(threads), 1)
+
+        response = self.fetch('/swagger/spec', headers={'Accept-Encoding': 'gzip'}, decompress_response=False)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(len(threads), 1)
+
+    @unittest.skipIf(executor is None, 'compressed inline without the futures package')
+    def test_compressed_off_the_ioloop(self):
+        threads = self.record_threads()
+        self.fetch('/swagger/spec', headers={'Accept-Encoding': 'gzip'}, decompress_response=False)
+        self.fetch('/swagger/spec?pretty=1', headers={'Accept-Encoding': 'gzip'}, decompress_response=False)
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_pretty_spec(self):
+        response = self.fetch('/swagger/spec?pretty=1')
+        self.assertIn(b'\n    ', response.body)
+        self.assertEqual(json.loads(response.body), json.loads(self.fetch('/swagger/spec').body))
+
+
+class ReplaceFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_replaces_whole_file(self):
+        path = os.path.join(self.directory, 'bundle.js')
+        replace_file(path, b'old')
+        replace_file(path, b'new')
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'new')
+        self.assertEqual(os.listdir(self.directory), ['bundle.js'])
+
+    def test_precompress_static(self):
+        path = os.path.join(self.directory, 'app.js')
+        with open(path, 'wb') as f:
+            f.write(b'var x = 1;\n' * 100)
+        precompress_static(self.directory)
+        self.assertIn('app.js.gz', os.listdir(self.directory))
+        with gzip.open(path + '.gz') as f:
+            self.assertEqual(f.read(), b'var x = 1;\n' * 100)
+        self.assertEqual([name for name in os.listdir(self.directory) if name.endswith('.tmp')], [])
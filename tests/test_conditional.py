@@ -0,0 +1,96 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import tornado.web
+from tornado_swagger import swagger
+from tornado_swagger.cache import spec_cache
+from tornado_swagger.settings import default_settings
+from tornado_swagger.views import SwaggerApiHandler
+from tests.support import SwaggerTestCase, ItemHandler
+
+__author__ = 'serena'
+
+
+@swagger.model()
+class Label(object):
+    """
+        @description: a label, "quoted" <& escaped>
+        @ptype parts: C{list} of L{Label}
+    """
+    def __init__(self, text, parts=None, color='red'):
+        pass
+
+
+class LabelHandler(tornado.web.RequestHandler):
+    @swagger.operation(nickname='put_label')
+    def put(self, label_id):
+        """
+            @param body: the label
+            @type body: L{Label}
+            @in body: body
+            @rtype: L{Label}
+        """
+
+
+class ConditionalTest(SwaggerTestCase):
+    def test_not_modified_skips_discovery(self):
+        calls = self.count_calls(SwaggerApiHandler, 'find_api')
+        response, spec = self.fetch_json('/swagger/spec')
+        self.assertEqual([api['path'] for api in spec['apis']], ['/items/{item_id}'])
+        self.assertEqual(len(calls), 1)
+
+        response = self.fetch('/swagger/spec', headers={'If-None-Match': response.headers['Etag']})
+        self.assertEqual(response.code, 304)
+        self.assertEqual(response.body, b'')
+        self.assertEqual(len(calls), 1)
+
+    def test_modified_spec_is_sent(self):
+        response = self.fetch('/swagger/spec')
+        self._app.add_handlers(r'.*$', [(r'/other/([^/]+)', ItemHandler)])
+        response = self.fetch('/swagger/spec', headers={'If-None-Match': response.headers['Etag']})
+        self.assertEqual(response.code, 200)
+
+    def test_resource_listing_not_modified(self):
+        response = self.fetch('/swagger/spec.json')
+        self.assertEqual(response.code, 200)
+        response = self.fetch('/swagger/spec.json', headers={'If-None-Match': response.headers['Etag']})
+        self.assertEqual(response.code, 304)
+
+
+class StreamedSpecTest(SwaggerTestCase):
+    def setUp(self):
+        super(StreamedSpecTest, self).setUp()
+        default_settings['stream_spec'] = True
+
+    def test_etag_follows_the_content(self):
+        etag = self.fetch('/swagger/spec').headers['Etag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(self.fetch('/swagger/spec', headers={'If-None-Match': etag}).code, 304)
+
+        # as another process serving the same handlers would
+        spec_cache.invalidate()
+        self.assertEqual(self.fetch('/swagger/spec').headers['Etag'], etag)
+
+        self._app.add_handlers(r'.*$', [(r'/other/([^/]+)', ItemHandler)])
+        self.assertEqual(self.fetch('/swagger/spec', headers={'If-None-Match': etag}).code, 200)
+
+    def test_different_specs_different_etags(self):
+        other = swagger.Application([(r'/items/([^/]+)', ItemHandler), (r'/other/([^/]+)', ItemHandler)])
+        generation = spec_cache.generation
+        etag = self.fetch('/swagger/spec').headers['Etag']
+        self.http_server.request_callback = other
+        self.assertNotEqual(self.fetch('/swagger/spec').headers['Etag'], etag)
+        self.assertEqual(spec_cache.generation, generation)
+
+    def test_same_bytes_as_cached(self):
+        self.http_server.request_callback = swagger.Application([(r'/items/([^/]+)', ItemHandler),
+                                                                 (r'/labels/([^/]+)', LabelHandler)])
+
+        def fetch_all():
+            return [self.fetch(url, headers={'Host': host}).body
+                    for url in ('/swagger/spec', '/swagger/spec/labels', '/swagger/spec?pretty=1')
+                    for host in ('localhost', 'api.example.com:8080')]
+        streamed = fetch_all()
+        default_settings['stream_spec'] = False
+        self.assertEqual(fetch_all(), streamed)
+        self.assertIn(b'"basePath": "http://api.example.com:8080"', streamed[1])
+        self.assertIn(b'"Label"', streamed[2])
@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import tornado.web
+from tornado import gen
+from tornado_swagger import swagger
+from tornado_swagger.settings import default_settings
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+
+def make_handler():
+    """
+    Returns a handler class decorated with the settings of the test.
+    """
+    class ItemHandler(tornado.web.RequestHandler):
+        @swagger.operation(nickname='get_item')
+        @gen.coroutine
+        def get(self, item_id):
+            """
+                @type item_id: L{integer}
+            """
+            yield gen.moment
+            self.write('%s %s' % (type(item_id).__name__, item_id))
+
+    return ItemHandler
+
+
+class CoroutineTest(SwaggerTestCase):
+    def get_app(self):
+        self.handler = make_handler()
+        return swagger.Application([(r'/items/([^/]+)', self.handler)])
+
+    def test_wrapped(self):
+        self.assertEqual(self.fetch('/items/5').body, b'unicode 5')
+        _, spec = self.fetch_json('/swagger/spec')
+        self.assertEqual([param['name'] for param in spec['apis'][0]['operations'][0]['parameters']], ['item_id'])
+
+    def test_wrapper_transparent(self):
+        get = self.handler.__dict__['get']
+        self.assertEqual(get.__name__, 'get')
+        self.assertIs(get.__wrapped__, get.rest_api.func)
+
+
+class ValidatedCoroutineTest(CoroutineTest):
+    def get_app(self):
+        default_settings['validate_requests'] = True
+        return super(ValidatedCoroutineTest, self).get_app()
+
+    def test_wrapped(self):
+        self.assertEqual(self.fetch('/items/5').body, b'int 5')
+        self.assertEqual(self.fetch('/items/x').code, 400)
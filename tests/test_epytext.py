@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import unittest
+from tornado_swagger.epytext import parse_fields, parse_fields_epydoc
+
+try:
+    import epydoc
+except ImportError:
+    epydoc = None
+
+__author__ = 'serena'
+
+# the docstrings the built-in parser must read as epydoc does
+CORPUS = [
+    """
+@param body: create a item.
+@type body: L{Item}
+@in body: body
+@return 200: item is created.
+@raise 400: invalid input
+""",
+    """
+@rtype: L{Item}
+@description: get information of a item
+@notes:
+    get a item,
+
+    This will be added to the Implementation Notes.It lets you put very long text in your api.
+""",
+    """
+@param property1:
+@type property1: L{string}
+@in property1: query
+@required property1: False
+
+@param property2:
+@type property2: L{string}
+@in property2: query
+@required property2: True
+@rtype: L{Item}
+@notes: GET /item?property1=1&property2=1
+""",
+    """
+@description:
+    This is an example of a model class that has parameters in its constructor
+    and the fields in the swagger spec are derived from the parameters to __init__.
+@notes:
+    In this case we would have property1, name as required parameters and property3 as optional parameter.
+@property property3: Item description
+@ptype property3: L{PropertySubclass}
+@ptype property4: C{list} of L{PropertySubclass}
+""",
+    """
+Text before the fields is not part of any field.
+
+@param x: first line
+    second   line
+    with I{italic} and B{bold} words
+@param y:
+    para one
+    still one
+
+    para two
+@notes: L{Foo<bar>} and C{a{b}c} and C{x} C{y} L{p} L{q}
+@description:   lead   spaces
+@param b : spaced arg
+@Param c: upper case tag
+@param d e: two words
+@return 404: braces E{lb}escaped E{rb}
+""",
+    """
+@notes: %s
+""" % ' '.join(['word%d' % i for i in range(60)]),
+    """
+@notes: Example::
+        GET /items?x=1
+        GET /items?x=2
+@description: literal block after the field tag
+""",
+    """
+@notes:
+    Query the items with::
+
+        GET /items?x=1
+          &y=2
+
+    and read the result.
+""",
+    """
+@notes:
+    Steps:
+      1. first step
+      2. second step, long enough to be wrapped by the printer at the margin of seventy five
+      3. third step
+    after the list
+""",
+    """
+@description:
+    Items:
+      - one
+      - two with C{code}
+        - nested
+      - three
+""",
+    """
+@notes: see U{the docs<http://example.com/docs>}, U{http://example.com} and U{example.com/x}
+@description: mail U{someone@example.com}
+""",
+    """
+@notes: a session
+
+    >>> fetch('/items')
+    200
+""",
+]
+
+
+def as_tuples(fields):
+    return [(f.tag, f.arg, f.body, f.code, f.link) for f in fields]
+
+
+class ParseFieldsTest(unittest.TestCase):
+    def test_literal_block(self):
+        notes, _ = parse_fields(CORPUS[6])
+        self.assertEqual(notes.body, 'Example:\n\n        GET /items?x=1\n        GET /items?x=2\n\n')
+
+    def test_numbered_list(self):
+        notes, = parse_fields(CORPUS[8])
+        self.assertEqual(notes.body, 'Steps:\n\n  1. first step\n  2. second step, long enough to be wrapped by the'
+                                     ' printer at the margin of\n     seventy five\n  3. third step\n\n'
+                                     'after the list\n\n')
+
+    def test_nested_list(self):
+        description, = parse_fields(CORPUS[9])
+        self.assertEqual(description.body, 'Items:\n\n  - one\n  - two with code\n      - nested\n  - three\n\n')
+        self.assertEqual(description.code, 'code')
+
+    def test_uri(self):
+        notes, description = parse_fields(CORPUS[10])
+        self.assertEqual(notes.body, "see 'the docs'<http://example.com/docs>, <http://example.com> and \n"
+                                     "'example.com/x'<http://example.com/x>\n\n")
+        self.assertEqual(description.body, "mail 'someone@example.com'<mailto:someone@example.com>\n\n")
+
+    @unittest.skipIf(epydoc is None, 'epydoc is not installed')
+    def test_same_as_epydoc(self):
+        for doc in CORPUS:
+            self.assertEqual(as_tuples(parse_fields(doc)), as_tuples(parse_fields_epydoc(doc)), doc)
@@ -0,0 +1,35 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from tornado_swagger.cache import spec_cache
+from tornado_swagger.views import SwaggerApiHandler
+from tests.support import SwaggerTestCase, ItemHandler
+
+__author__ = 'serena'
+
+
+class HostHeaderTest(SwaggerTestCase):
+    def test_host_headers_do_not_grow_the_cache(self):
+        builds = self.count_calls(SwaggerApiHandler, 'build_spec', classmethod)
+        for index in range(200):
+            response, spec = self.fetch_json('/swagger/spec', headers={'Host': 'host%d.example.com' % index})
+            self.assertEqual(spec['basePath'], 'http://host%d.example.com' % index)
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(len(spec_cache.entries), spec_cache.max_group_entries)
+        self.assertEqual(sum(len(keys) for keys in spec_cache.tagged.values()),
+                         len(spec_cache.entries) + len(spec_cache.documents))
+
+    def test_recently_used_base_paths_are_kept(self):
+        self.fetch_json('/swagger/spec', headers={'Host': 'api.example.com'})
+        key = [key for key in spec_cache.entries if 'http://api.example.com' in key][0]
+        entry = spec_cache.entries[key]
+        for index in range(3 * spec_cache.max_group_entries):
+            self.fetch_json('/swagger/spec', headers={'Host': 'host%d.example.com' % index})
+            self.fetch_json('/swagger/spec', headers={'Host': 'api.example.com'})
+        self.assertIs(spec_cache.entries.get(key), entry)
+
+    def test_invalidation_drops_the_groups(self):
+        for index in range(3):
+            self.fetch_json('/swagger/spec', headers={'Host': 'host%d.example.com' % index})
+        self._app.add_handlers(r'.*$', [(r'/other/([^/]+)', ItemHandler)])
+        self.assertEqual(spec_cache.entries, {})
+        self.assertEqual(spec_cache.groups, {})
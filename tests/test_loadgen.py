@@ -0,0 +1,81 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from tornado import gen
+from tornado.testing import gen_test
+from tornado_swagger.loadgen import synthesize, drive, drive_each, report, format_report
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+SPEC = {
+    'basePath': 'http://localhost:8888',
+    'apis': [{
+        'path': '/items/{item_id}',
+        'operations': [{
+            'nickname': 'update_item',
+            'httpMethod': 'PUT',
+            'parameters': [
+                {'name': 'item_id', 'dataType': 'string', 'paramType': 'path'},
+                {'name': 'limit', 'dataType': 'integer', 'paramType': 'query'},
+                {'name': 'body', 'dataType': 'Node', 'paramType': 'body'},
+            ],
+        }],
+    }],
+    'models': {
+        'Node': {
+            'id': 'Node',
+            'required': ['child'],
+            'properties': {
+                'name': {'type': 'string'},
+                'size': {'type': 'integer', 'default': 3},
+                'child': {'$ref': 'Node'},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+            },
+        },
+    },
+}
+
+
+class SynthesizeTest(unittest.TestCase):
+    def test_request_from_spec(self):
+        target, = synthesize(SPEC)
+        self.assertEqual((target.nickname, target.method, target.path), ('update_item', 'PUT', '/items/{item_id}'))
+        self.assertEqual(target.url, 'http://localhost:8888/items/1?limit=1')
+        self.assertEqual(target.headers, {'Content-Type': 'application/json'})
+        self.assertEqual(json.loads(target.body), {'name': 'example', 'size': 3, 'child': None, 'tags': ['example']})
+
+    def test_base_url(self):
+        target, = synthesize(SPEC, 'http://127.0.0.1:9999/')
+        self.assertTrue(target.url.startswith('http://127.0.0.1:9999/items/1'))
+
+
+class DriveTest(SwaggerTestCase):
+    @gen.coroutine
+    def targets(self):
+        response = yield self.http_client.fetch(self.get_url('/swagger/spec'))
+        raise gen.Return(synthesize(json.loads(response.body), self.get_url('')))
+
+    @gen_test
+    def test_rates_reported(self):
+        targets = yield self.targets()
+        self.assertEqual([target.url for target in targets], [self.get_url('/items/1')])
+
+        stats, elapsed = yield drive(targets, requests=5, concurrency=2)
+        alone = yield drive_each(targets, requests=3, concurrency=2)
+        row, = report(targets, stats, alone)
+        self.assertEqual((row['operation'], row['requests'], row['errors'], row['statuses']),
+                         ('GET /items/{item_id}', 5, 0, {'200': 5}))
+        self.assertEqual(row['rps'], round(5 / elapsed, 1))
+        self.assertEqual(len(alone[targets[0]].timings), 3)
+        self.assertGreater(row['alone_rps'], 0)
+        self.assertIn('GET /items/{item_id}', format_report([row], elapsed))
+
+    @gen_test
+    def test_rates_without_phases(self):
+        targets = yield self.targets()
+        stats, elapsed = yield drive(targets, requests=2, concurrency=1, warm_up=False)
+        row, = report(targets, stats)
+        self.assertIsNone(row['alone_rps'])
+        self.assertTrue(format_report([row], elapsed).splitlines()[1].endswith(' -'))
@@ -0,0 +1,96 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import unittest
+from tornado_swagger.metrics import BUCKETS, Metrics, OperationMetrics, metrics
+from tornado_swagger.settings import default_settings
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+
+class OperationMetricsTest(unittest.TestCase):
+    def test_counters(self):
+        operation = OperationMetrics('get_item', 'GET')
+        for status, seconds in [(200, 0.0005), (200, 0.001), (404, 0.002), (500, 20.0)]:
+            operation.observe(status, seconds)
+        self.assertEqual(operation.count, 4)
+        self.assertEqual(operation.sum, 0.0005 + 0.001 + 0.002 + 20.0)
+        self.assertEqual(operation.statuses, {200: 2, 404: 1, 500: 1})
+        self.assertEqual(operation.errors, 1)
+        # the bounds are inclusive, as Prometheus' le
+        self.assertEqual(operation.buckets, [2, 1] + [0] * (len(BUCKETS) - 2) + [1])
+
+    def test_quantile(self):
+        operation = OperationMetrics('get_item', 'GET')
+        self.assertIsNone(operation.quantile(0.5))
+        for seconds in (0.0005, 0.0005, 0.002, 0.002):
+            operation.observe(200, seconds)
+        self.assertEqual(operation.quantile(0.5), 0.001)
+        self.assertAlmostEqual(operation.quantile(0.75), 0.00175)
+        self.assertEqual(operation.quantile(1.0), 0.0025)
+        operation.observe(200, 60.0)
+        self.assertEqual(operation.quantile(0.99), BUCKETS[-1])
+
+
+class PrometheusTest(unittest.TestCase):
+    def test_exposition_format(self):
+        registry = Metrics()
+        registry.operations['get_item', 'GET'] = operation = OperationMetrics('get_item', 'GET')
+        operation.observe(200, 0.25)
+        operation.observe(404, 0.5)
+        registry.operations['say "hi"', 'POST'] = OperationMetrics('say "hi"', 'POST')
+
+        lines = registry.prometheus().splitlines()
+        self.assertEqual(lines[:4], [
+            '# HELP swagger_operation_requests_total Requests answered by each documented operation.',
+            '# TYPE swagger_operation_requests_total counter',
+            'swagger_operation_requests_total{method="GET",nickname="get_item",code="200"} 1',
+            'swagger_operation_requests_total{method="GET",nickname="get_item",code="404"} 1',
+        ])
+        self.assertEqual(lines[4:6], [
+            '# HELP swagger_operation_duration_seconds Latency of each documented operation.',
+            '# TYPE swagger_operation_duration_seconds histogram',
+        ])
+        labels = 'method="GET",nickname="get_item"'
+        histogram = lines[6:6 + len(BUCKETS) + 3]
+        bucket = 'swagger_operation_duration_seconds_bucket{%s,le="%%s"} %%d' % labels
+        self.assertEqual(histogram[BUCKETS.index(0.1)], bucket % (0.1, 0))
+        self.assertEqual(histogram[BUCKETS.index(0.25)], bucket % (0.25, 1))
+        self.assertEqual(histogram[BUCKETS.index(0.5)], bucket % (0.5, 2))
+        self.assertEqual(histogram[-3:], [
+            'swagger_operation_duration_seconds_bucket{%s,le="+Inf"} 2' % labels,
+            'swagger_operation_duration_seconds_sum{%s} 0.75' % labels,
+            'swagger_operation_duration_seconds_count{%s} 2' % labels,
+        ])
+        self.assertEqual(lines[-1], 'swagger_operation_duration_seconds_count{method="POST",nickname="say \\"hi\\""} 0')
+
+
+class MetricsHandlerTest(SwaggerTestCase):
+    def get_app(self):
+        default_settings['metrics'] = True
+        self.addCleanup(metrics.clear)
+        metrics.clear()
+        return super(MetricsHandlerTest, self).get_app()
+
+    def test_recorded(self):
+        for _ in range(2):
+            self.fetch('/items/1')
+        self.fetch('/swagger/spec')
+        _, snapshot = self.fetch_json('/swagger/metrics')
+        operation, = snapshot['operations']
+        self.assertEqual((operation['nickname'], operation['method'], operation['count'], operation['statuses']),
+                         ('get_item', 'GET', 2, {'200': 2}))
+        self.assertEqual(sum(operation['buckets']), 2)
+        self.assertEqual(snapshot['buckets'], list(BUCKETS))
+
+    def test_prometheus(self):
+        self.fetch('/items/1')
+        response = self.fetch('/swagger/metrics?format=prometheus')
+        self.assertEqual(response.headers['Content-Type'], 'text/plain; version=0.0.4')
+        self.assertIn(b'swagger_operation_requests_total{method="GET",nickname="get_item",code="200"} 1\n',
+                      response.body)
+        accepted = self.fetch('/swagger/metrics', headers={'Accept': 'text/plain'})
+        self.assertEqual(accepted.headers['Content-Type'], 'text/plain; version=0.0.4')
+        self.assertEqual(self.fetch('/swagger/metrics?format=xml').code, 400)
+        self.assertEqual(json.loads(self.fetch('/swagger/metrics?format=json').body)['operations'][0]['count'], 1)
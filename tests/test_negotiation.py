@@ -0,0 +1,27 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import unittest
+from tornado_swagger.compress import qualities, accepted_encodings
+from tornado_swagger.formats import MEDIA_TYPES, negotiate_format
+
+__author__ = 'serena'
+
+
+class QualitiesTest(unittest.TestCase):
+    def test_qualities(self):
+        self.assertEqual(qualities('GZIP;q=0.5, br ; q = 0 ,identity;level=1, x;q=high'),
+                         {'gzip': 0.5, 'br': 0.0, 'identity': 1.0, 'x': 0.0})
+
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings('gzip;q=0.5'), ['gzip'])
+        self.assertEqual(accepted_encodings('gzip;q=0'), [])
+        self.assertEqual(accepted_encodings(None), [])
+        self.assertIn('gzip', accepted_encodings('*'))
+
+    @unittest.skipIf('application/msgpack' not in MEDIA_TYPES, 'msgpack is not installed')
+    def test_negotiate_format(self):
+        self.assertEqual(negotiate_format('application/msgpack'), 'msgpack')
+        self.assertEqual(negotiate_format('application/json;q=0.5, application/msgpack;q=0.9'), 'msgpack')
+        self.assertIsNone(negotiate_format('application/json, application/msgpack'))
+        self.assertIsNone(negotiate_format('application/*;q=0.9, application/msgpack;q=0.9'))
+        self.assertIsNone(negotiate_format('text/html'))
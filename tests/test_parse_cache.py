@@ -0,0 +1,100 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+from tornado_swagger import swagger
+from tornado_swagger.parse_cache import ParseCache
+from tornado_swagger.settings import default_settings
+
+__author__ = 'serena'
+
+DOC = """
+    @param limit: how many items
+    @type limit: L{integer}
+    @in limit: query
+"""
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        saved_settings = dict(default_settings)
+        self.addCleanup(default_settings.update, saved_settings)
+        default_settings.update(parse_cache=self.directory, lazy_parse=False)
+        self.addCleanup(setattr, swagger, 'parse_cache', swagger.parse_cache)
+
+        self.parsed = []
+        parse = swagger.operation.__dict__['_parse']
+
+        def counted(op):
+            self.parsed.append(op.nickname)
+            return parse(op)
+        swagger.operation._parse = counted
+        self.addCleanup(setattr, swagger.operation, '_parse', parse)
+
+    def start(self):
+        """
+        Starts over with the file, as the next run of the process does.
+        """
+        cache = swagger.parse_cache = ParseCache()
+        # nothing left to write at exit, once the directory is gone
+        self.addCleanup(setattr, cache, 'directory', None)
+        return cache
+
+    def cache_file(self):
+        cache = ParseCache()
+        cache.directory = self.directory
+        return cache.path
+
+    def decorate(self, doc=DOC):
+        def get(self, item_id):
+            pass
+        get.__doc__ = doc
+        return swagger.operation(nickname='get_items')(get).rest_api
+
+    def test_round_trip(self):
+        cache = self.start()
+        parsed = self.decorate()
+        cache.save()
+        self.assertTrue(os.path.isfile(cache.path))
+        self.assertEqual(self.parsed, ['get_items'])
+
+        self.start()
+        restored = self.decorate()
+        self.assertEqual(self.parsed, ['get_items'])
+        self.assertTrue(restored.parsed)
+        self.assertEqual(restored.params, parsed.params)
+        self.assertEqual([param['name'] for param in restored.params], ['item_id', 'limit'])
+
+    def test_changed_docstring_parsed_again(self):
+        self.start()
+        self.decorate()
+        swagger.parse_cache.save()
+
+        self.start()
+        changed = self.decorate(DOC.replace('how many items', 'at most this many items'))
+        self.assertEqual(self.parsed, ['get_items', 'get_items'])
+        self.assertEqual(changed.params[1]['description'], 'at most this many items')
+
+    def test_corrupt_file_ignored(self):
+        with open(self.cache_file(), 'wb') as f:
+            f.write(b'not marshal data')
+        cache = self.start()
+        self.assertEqual([param['name'] for param in self.decorate().params], ['item_id', 'limit'])
+        self.assertEqual(self.parsed, ['get_items'])
+        # and replaced by a good one
+        cache.save()
+        self.start()
+        self.decorate()
+        self.assertEqual(self.parsed, ['get_items'])
+
+    def test_unreadable_file_ignored(self):
+        os.mkdir(self.cache_file())
+        cache = self.start()
+        self.assertEqual([param['name'] for param in self.decorate().params], ['item_id', 'limit'])
+        self.assertEqual(self.parsed, ['get_items'])
+        cache.save()
+        self.assertTrue(cache.dirty)
@@ -0,0 +1,99 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import operator
+import threading
+import unittest
+from tornado_swagger import swagger
+from tornado_swagger.settings import default_settings, unparsed
+
+__author__ = 'serena'
+
+
+class LazyParseTest(unittest.TestCase):
+    def setUp(self):
+        saved_settings = dict(default_settings)
+        self.addCleanup(default_settings.update, saved_settings)
+        default_settings['lazy_parse'] = True
+        self.addCleanup(unparsed.__delitem__, slice(len(unparsed), None))
+
+    def test_failure_raised_again(self):
+        def get(handler, item_id):
+            """
+                @description: first argument not named self
+            """
+        op = swagger.operation(nickname='get_item')
+        op(get)
+        for _ in range(2):
+            self.assertRaises(ValueError, op.parse)
+            self.assertFalse(op.parsed)
+
+    def test_parsed_once_complete(self):
+        def get(self, item_id):
+            """
+                @param limit: how many items
+                @type limit: L{integer}
+                @in limit: query
+            """
+        op = swagger.operation(nickname='get_items')
+        op(get)
+
+        parse_docstring = swagger.operation.parse_docstring
+        started = threading.Event()
+
+        def slow_parse_docstring(self, text):
+            started.set()
+            time.sleep(0.2)
+            parse_docstring(self, text)
+
+        swagger.operation.parse_docstring = slow_parse_docstring
+        self.addCleanup(delattr, swagger.operation, 'parse_docstring')
+        thread = threading.Thread(target=op.parse)
+        thread.start()
+        started.wait()
+        self.assertEqual([param['name'] for param in op.parse().params], ['item_id', 'limit'])
+        thread.join()
+
+
+class FrozenMetadataTest(unittest.TestCase):
+    def test_operation_frozen(self):
+        def get(self, item_id, limit=10):
+            """
+                @type limit: L{integer}
+                @in limit: query
+                @rtype: L{Item}
+                @return 404: no such item
+            """
+        op = swagger.operation(nickname='get_item')
+        op(get)
+        self.assertTrue(op.parsed)
+        self.assertFalse(hasattr(op, '__dict__'))
+        self.assertRaises(AttributeError, setattr, op, 'extra', 1)
+        for name in ('params', 'responseMessages', 'refs', 'func_args'):
+            value = getattr(op, name)
+            self.assertIsInstance(value, tuple, name)
+            self.assertRaises(TypeError, operator.setitem, value, 0, None)
+        self.assertEqual([param['name'] for param in op.params], ['item_id', 'limit'])
+        self.assertIs(op.params[1]['name'], intern('limit'))
+        # the parse-time leftovers are dropped
+        self.assertIsNone(op.kwds)
+        self.assertIsNone(op.properties)
+
+    def test_model_frozen(self):
+        @swagger.model()
+        class Frozen(object):
+            """
+                @ptype parts: C{list} of L{Frozen}
+            """
+            def __init__(self, name, parts=None):
+                pass
+        model = Frozen.rest_model
+        self.assertFalse(hasattr(model, '__dict__'))
+        self.assertRaises(AttributeError, setattr, model, 'extra', 1)
+        self.assertEqual(model.required, ('name',))
+        self.assertRaises(TypeError, operator.setitem, model.required, 0, 'other')
+        self.assertIsInstance(model.refs, tuple)
+        self.assertEqual(sorted(model.refs), ['Frozen', 'array', 'string'])
+        self.assertIsNone(model.params)
+        self.assertIsNone(model.args)
+        self.assertIsNone(model.kwargs)
@@ -0,0 +1,55 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import tornado.web
+from tornado_swagger import swagger
+from tornado_swagger.settings import default_settings
+from tests.support import SwaggerTestCase, ItemHandler
+
+__author__ = 'serena'
+
+
+class OrderHandler(tornado.web.RequestHandler):
+    """
+    Orders of items.
+    """
+    @swagger.operation(nickname='get_order')
+    def get(self, order_id):
+        """
+            @description: get an order
+        """
+
+
+class JobHandler(tornado.web.RequestHandler):
+    @swagger.operation(nickname='run_job')
+    def post(self, job_id):
+        """
+            @description: run an internal job
+        """
+
+
+class ResourceListingTest(SwaggerTestCase):
+    def get_app(self):
+        default_settings['exclude_namespaces'] = ['internal']
+        return swagger.Application([
+            (r'/items/([^/]+)', ItemHandler),
+            (r'/orders/([^/]+)', OrderHandler),
+            (r'/internal/jobs/([^/]+)', JobHandler),
+        ])
+
+    def test_links_resolve(self):
+        _, listing = self.fetch_json('/swagger/spec.json')
+        self.assertEqual(listing['basePath'], self.get_url('').rstrip('/'))
+        self.assertEqual([(api['path'], api['description']) for api in listing['apis']],
+                         [('/swagger/spec/items', ''), ('/swagger/spec/orders', 'Orders of items.')])
+        for api in listing['apis']:
+            _, spec = self.fetch_json(api['path'])
+            resource = api['path'].rsplit('/', 1)[1]
+            self.assertEqual(spec['resourcePath'], '/' + resource)
+            self.assertEqual([entry['path'] for entry in spec['apis']], ['/%s/{%s_id}' % (resource, resource[:-1])])
+
+    def test_excluded_namespaces_left_out(self):
+        _, spec = self.fetch_json('/swagger/spec')
+        self.assertEqual([api['path'] for api in spec['apis']], ['/items/{item_id}', '/orders/{order_id}'])
+        self.assertEqual(self.fetch('/swagger/spec/internal').code, 404)
+        # still served, only not documented
+        self.assertEqual(self.fetch('/internal/jobs/1', method='POST', body=b'').code, 200)
@@ -0,0 +1,90 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import unittest
+from tornado_swagger import swagger
+
+__author__ = 'serena'
+
+
+@swagger.model(serializers=True)
+class Part(object):
+    """
+        @ptype size: L{integer}
+    """
+    def __init__(self, name, size=1):
+        self.name = name
+        self.size = size
+
+
+@swagger.model(serializers=True)
+class Assembly(object):
+    """
+        @ptype main: L{Part}
+        @ptype parts: C{list} of L{Part}
+        @ptype parent: L{Assembly}
+    """
+    def __init__(self, name, main=None, parts=None, parent=None, count=0):
+        self.name = name
+        self.main = main
+        self.parts = parts
+        self.parent = parent
+        self.count = count
+
+
+@swagger.model(serializers=True, slots=True)
+class SlottedPart(object):
+    """
+        @ptype size: L{integer}
+    """
+    def __init__(self, name, size=1):
+        self.name = name
+        self.size = size
+
+
+@swagger.model(serializers=True)
+class CustomPart(object):
+    def __init__(self, name):
+        self.name = name
+
+    def to_dict(self):
+        return {'custom': self.name}
+
+
+class SerializersTest(unittest.TestCase):
+    def test_round_trip(self):
+        data = {'name': 'car', 'main': {'name': 'engine', 'size': 2},
+                'parts': [{'name': 'wheel', 'size': 4}, {'name': 'door', 'size': 1}],
+                'parent': {'name': 'fleet', 'main': None, 'parts': None, 'parent': None, 'count': 0},
+                'count': 3}
+        assembly = Assembly.from_dict(data)
+        self.assertIsInstance(assembly.main, Part)
+        self.assertEqual([part.name for part in assembly.parts], ['wheel', 'door'])
+        self.assertIsInstance(assembly.parent, Assembly)
+        self.assertEqual(assembly.to_dict(), data)
+
+    def test_defaults(self):
+        assembly = Assembly.from_dict({'name': 'car'})
+        self.assertEqual(assembly.to_dict(), {'name': 'car', 'main': None, 'parts': None, 'parent': None,
+                                              'count': 0})
+        self.assertIsNone(Assembly.from_dict(None))
+
+    def test_bad_input(self):
+        for data, message in [
+                ('car', 'Assembly must be an object, not str'),
+                ({'name': 'car', 'main': 'x'}, 'main of Assembly must be an object, not str'),
+                ({'name': 'car', 'parts': {'name': 'wheel'}}, 'parts of Assembly must be a list, not dict'),
+                ({'name': 'car', 'parts': [1]}, 'Part must be an object, not int')]:
+            with self.assertRaises(ValueError) as context:
+                Assembly.from_dict(data)
+            self.assertEqual(str(context.exception), message)
+
+    def test_slots(self):
+        self.assertEqual(SlottedPart.__slots__, ('name', 'size'))
+        part = SlottedPart.from_dict({'name': 'wheel', 'size': 4})
+        self.assertFalse(hasattr(part, '__dict__'))
+        self.assertEqual(part.to_dict(), {'name': 'wheel', 'size': 4})
+        self.assertRaises(AttributeError, setattr, part, 'color', 'red')
+
+    def test_defined_methods_kept(self):
+        part = CustomPart.from_dict({'name': 'wheel'})
+        self.assertEqual(part.to_dict(), {'custom': 'wheel'})
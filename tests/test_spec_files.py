@@ -0,0 +1,69 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import tornado.web
+from tornado_swagger import swagger
+from tornado_swagger.settings import default_settings, unparsed
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_app():
+    """
+    Returns the application compiled by the test, with its handlers decorated
+    under the current settings.
+    """
+    class ItemHandler(tornado.web.RequestHandler):
+        @swagger.operation(nickname='get_item')
+        def get(self, item_id):
+            """
+                @param item_id: the id of the item
+                @type item_id: L{integer}
+            """
+            self.write(item_id)
+
+    return swagger.Application([(r'/items/([^/]+)', ItemHandler)])
+
+
+class SpecFilesTest(SwaggerTestCase):
+    def get_app(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        with open(os.devnull, 'w') as devnull:
+            subprocess.check_call([sys.executable, '-m', 'tornado_swagger.build', 'tests.test_spec_files:make_app',
+                                   '-o', self.directory, '-b', 'http://api.example.com'], cwd=ROOT, stdout=devnull)
+
+        # any parsing while serving would need epydoc, which cannot be imported
+        default_settings.update(spec_path=self.directory, docstring_parser='epydoc')
+        for name in [name for name in sys.modules if name == 'epydoc' or name.startswith('epydoc.')]:
+            self.addCleanup(sys.modules.__setitem__, name, sys.modules.pop(name))
+        sys.modules['epydoc'] = None
+        self.addCleanup(sys.modules.pop, 'epydoc')
+        self.addCleanup(unparsed.__delitem__, slice(len(unparsed), None))
+        return make_app()
+
+    def read(self, name):
+        with open(os.path.join(self.directory, name)) as f:
+            return json.load(f)
+
+    def test_served_from_disk(self):
+        for url, name in [('/swagger/spec.json', 'resources.json'), ('/swagger/spec', 'spec.json'),
+                          ('/swagger/spec/items', 'spec/items.json')]:
+            _, served = self.fetch_json(url)
+            self.assertEqual(served, self.read(name))
+        self.assertEqual(self.fetch('/swagger/spec/orders').code, 404)
+
+        _, spec = self.fetch_json('/swagger/spec')
+        self.assertEqual(spec['basePath'], 'http://api.example.com')
+        self.assertEqual(spec['apis'][0]['operations'][0]['parameters'][0]['description'], 'the id of the item')
+        self.assertEqual(self.fetch('/items/5').body, b'5')
+        self.assertIsNone(sys.modules['epydoc'])
+        self.assertFalse(unparsed[-1].parsed)
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+import tornado.web
+from tornado_swagger import swagger
+from tornado_swagger.settings import default_settings
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+
+@swagger.model()
+class Dimensions(object):
+    """
+        @ptype width: L{integer}
+    """
+    def __init__(self, width, height=0):
+        pass
+
+
+@swagger.model()
+class Listing(object):
+    """
+        @ptype size: L{Dimensions}
+        @ptype extra: C{list} of L{Dimensions}
+        @ptype price: L{number}
+    """
+    def __init__(self, name, size=None, extra=None, price=0):
+        pass
+
+
+def make_handler():
+    """
+    Returns a handler class decorated with the settings of the test.
+    """
+    class ListingHandler(tornado.web.RequestHandler):
+        @swagger.operation(nickname='get_listing')
+        def get(self, listing_id, kind):
+            """
+                @type listing_id: L{integer}
+                @enum kind: new, used
+                @param limit: how many
+                @type limit: L{integer}
+                @in limit: query
+                @required limit: True
+                @param order: sort order
+                @in order: query
+                @enum order: asc, desc
+                @param page: one of the first pages
+                @type page: L{integer}
+                @in page: query
+                @enum page: 1, 2, 3
+                @param exact: exact match
+                @type exact: L{boolean}
+                @in exact: query
+            """
+            self.write({'listing_id': listing_id, 'kind': kind, 'validated': self.validated})
+
+        @swagger.operation(nickname='update_listing')
+        def put(self, listing_id, kind):
+            """
+                @type listing_id: L{integer}
+                @param body: the listing
+                @type body: L{Listing}
+                @in body: body
+                @required body: True
+            """
+            self.write({'body': self.validated['body']})
+
+    return ListingHandler
+
+
+class ValidationTest(SwaggerTestCase):
+    def get_app(self):
+        default_settings['validate_requests'] = True
+        return swagger.Application([(r'/listings/([^/]+)/([^/]+)', make_handler())])
+
+    def errors(self, path, **kwds):
+        response = self.fetch(path, **kwds)
+        self.assertEqual(response.code, 400)
+        body = json.loads(response.body)
+        self.assertEqual((body['code'], body['message']), (400, 'Invalid request'))
+        return sorted((error['name'], error['in'], error['message']) for error in body['errors'])
+
+    def put(self, body):
+        return dict(method='PUT', body=json.dumps(body) if not isinstance(body, bytes) else body)
+
+    def test_valid_request_passes(self):
+        _, result = self.fetch_json('/listings/7/used?limit=5&order=desc&page=2&exact=true')
+        self.assertEqual(result, {'listing_id': 7, 'kind': 'used', 'validated': {
+            'listing_id': 7, 'kind': 'used', 'limit': 5, 'order': 'desc', 'page': 2, 'exact': True}})
+        body = {'name': 'car', 'size': {'width': 2}, 'extra': [{'width': 1, 'height': 3}], 'price': 9.5}
+        _, result = self.fetch_json('/listings/7/new', **self.put(body))
+        self.assertEqual(result, {'body': body})
+
+    def test_required(self):
+        self.assertEqual(self.errors('/listings/7/new'), [('limit', 'query', 'is required')])
+        self.assertEqual(self.errors('/listings/7/new', method='PUT', body=b''), [('body', 'body', 'is required')])
+        self.assertEqual(self.errors('/listings/7/new', **self.put({'size': {}})),
+                         [('body.name', 'body', 'is required'), ('body.size.width', 'body', 'is required')])
+
+    def test_type(self):
+        self.assertEqual(self.errors('/listings/x/new?limit=many&exact=maybe'), [
+            ('exact', 'query', 'must be true or false'),
+            ('limit', 'query', 'must be an integer'),
+            ('listing_id', 'path', 'must be an integer')])
+        self.assertEqual(self.errors('/listings/7/new', **self.put(b'{')), [('body', 'body', 'must be valid json')])
+        self.assertEqual(self.errors('/listings/7/new', **self.put(
+            {'name': 'car', 'size': [], 'extra': [{'width': 'wide'}], 'price': 'free'})), [
+            ('body.extra[0].width', 'body', 'must be an integer'),
+            ('body.price', 'body', 'must be a number'),
+            ('body.size', 'body', 'must be an object')])
+
+    def test_enum(self):
+        self.assertEqual(self.errors('/listings/7/broken?limit=1&order=up&page=4'), [
+            ('kind', 'path', 'must be one of new, used'),
+            ('order', 'query', 'must be one of asc, desc'),
+            ('page', 'query', 'must be one of 1, 2, 3')])
+        # compared once converted to the type of the parameter
+        _, result = self.fetch_json('/listings/7/new?limit=1&page=03')
+        self.assertEqual(result['validated']['page'], 3)
+
+    def test_enum_in_spec(self):
+        _, spec = self.fetch_json('/swagger/spec')
+        params = dict((param['name'], param) for param in spec['apis'][0]['operations'][0]['parameters'])
+        self.assertEqual(params['kind']['enum'], ['new', 'used'])
+        self.assertEqual(params['page']['enum'], ['1', '2', '3'])
+        self.assertNotIn('enum', params['limit'])
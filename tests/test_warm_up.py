@@ -0,0 +1,33 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import gc
+import unittest
+from tornado_swagger import swagger
+from tornado_swagger.cache import spec_cache
+from tests.support import SwaggerTestCase
+
+__author__ = 'serena'
+
+
+class WarmUpTest(SwaggerTestCase):
+    def setUp(self):
+        super(WarmUpTest, self).setUp()
+        self.addCleanup(gc.set_threshold, *gc.get_threshold())
+        if hasattr(gc, 'unfreeze'):
+            self.addCleanup(gc.unfreeze)
+
+    def test_spec_built_before_serving(self):
+        swagger.warm_up(self._app, ['http://localhost'])
+        self.assertTrue(spec_cache.entries)
+        self.assertEqual(self.fetch('/swagger/spec', headers={'Host': 'localhost'}).code, 200)
+
+    @unittest.skipIf(hasattr(gc, 'freeze'), 'gc.freeze() is used instead')
+    def test_full_collections_put_off(self):
+        threshold0, threshold1, _ = gc.get_threshold()
+        swagger.warm_up(self._app, ['http://localhost'], freeze=True)
+        self.assertEqual(gc.get_threshold(), (threshold0, threshold1, swagger.FULL_COLLECTION_THRESHOLD))
+
+    def test_collector_left_alone(self):
+        threshold = gc.get_threshold()
+        swagger.warm_up(self._app, ['http://localhost'])
+        self.assertEqual(gc.get_threshold(), threshold)
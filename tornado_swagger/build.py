@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Compiles the swagger specs of an application into static files:
+
+    python -m tornado_swagger.build myapp:application -o spec/ -b http://api.example.com
+
+and serve them with swagger.docs(spec_path='spec/'), which never runs discovery.
+"""
+import os
+import sys
+import argparse
+import importlib
+import urlparse
+import tornado.web
+from tornado.escape import utf8
+from settings import default_settings
+from views import SwaggerApiHandler, SwaggerResourcesHandler, application_resources, json_dumps
+from compress import ENCODINGS, EXTENSIONS, compress, replace_file
+
+__author__ = 'serena'
+
+
+def load_application(target):
+    """
+    Imports 'module:attribute', where attribute is an Application
+    or a callable returning one.
+    """
+    module_name, _, attribute = target.partition(':')
+    application = getattr(importlib.import_module(module_name), attribute or 'application')
+    if not isinstance(application, tornado.web.Application):
+        application = application()
+    return application
+
+
+def write_file(path, data):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    for encoding in (None,) + ENCODINGS:
+        replace_file(path + EXTENSIONS[encoding] if encoding else path, compress(data, encoding) if encoding else data)
+
+
+def build(application, output, base_url, pretty=False):
+    """
+    Writes resources.json, spec.json and spec/<resource>.json under output,
+    with the handlers that serve the host of base_url.
+    """
+    api_version = default_settings['api_version']
+    exclude_namespaces = default_settings['exclude_namespaces']
+    base_path = urlparse.urljoin(base_url, default_settings['base_url'])[:-1]
+    host = urlparse.urlparse(base_url).netloc
+
+    def dump(name, obj):
+        write_file(os.path.join(output, name), utf8(json_dumps(obj, pretty)))
+
+    dump('resources.json', SwaggerResourcesHandler.build_resources(
+        application, api_version, exclude_namespaces, base_url.rstrip('/'), host))
+    dump('spec.json', SwaggerApiHandler.build_spec(application, api_version, exclude_namespaces, base_path,
+                                                   None, host))
+    resources = application_resources(application, exclude_namespaces, host)
+    for resource in resources:
+        dump(os.path.join('spec', resource + '.json'), SwaggerApiHandler.build_spec(
+            application, api_version, exclude_namespaces, base_path, resource, host))
+    return list(resources)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tornado_swagger.build',
+                                     description='Compile the swagger specs of an application into static files.')
+    parser.add_argument('application', help="the application to document, as 'module:attribute'")
+    parser.add_argument('-o', '--output', default='spec', help='output directory (default: spec)')
+    parser.add_argument('-b', '--base-url', required=True,
+                        help='scheme and host the api is served from, e.g. http://api.example.com')
+    parser.add_argument('--pretty', action='store_true', help='indent the json files')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    resources = build(load_application(args.application), args.output, args.base_url, args.pretty)
+    print('wrote %d resources to %s' % (len(resources), args.output))
+
+
+if __name__ == "__main__":
+    main()
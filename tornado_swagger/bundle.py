@@ -0,0 +1,94 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import re
+import posixpath
+from tornado.web import StaticFileHandler
+from compress import replace_file
+
+__author__ = 'serena'
+
+# the assets of index.html, in the order it loads them
+STYLESHEETS = (
+    'css/highlight.default.css',
+    'css/screen.css',
+)
+SCRIPTS = (
+    'lib/shred.bundle.js',
+    'lib/jquery-1.8.0.min.js',
+    'lib/jquery.slideto.min.js',
+    'lib/jquery.wiggle.min.js',
+    'lib/jquery.ba-bbq.min.js',
+    'lib/handlebars-1.0.0.js',
+    'lib/underscore-min.js',
+    'lib/backbone-min.js',
+    'lib/swagger.js',
+    'swagger-ui.js',
+    'lib/highlight.7.3.pack.js',
+    'lib/swagger-oauth.js',
+)
+BUNDLES = (
+    ('bundle.css', STYLESHEETS, b'\n'),
+    ('bundle.js', SCRIPTS, b'\n;\n'),
+)
+
+CSS_URL = re.compile(br'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def versioned_url(static_path, path):
+    """
+    Returns the relative url of the asset at path with the hash of its content,
+    as StaticFileHandler.static_url() makes them: such urls are cached for ever.
+    """
+    version = StaticFileHandler.get_version({'static_path': static_path}, path)
+    return '%s?v=%s' % (path, version) if version else path
+
+
+def _rebase_css(static_path, name, css):
+    """
+    Makes the relative urls of the stylesheet name relative to static_path,
+    where the bundle is, and versioned.
+    """
+    directory = posixpath.dirname(name)
+
+    def rebase(match):
+        url = match.group(2).strip()
+        if b':' in url or url.startswith((b'/', b'#')):
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(directory, url.decode('utf-8')))
+        return b'url(' + versioned_url(static_path, path).encode('utf-8') + b')'
+    return CSS_URL.sub(rebase, css)
+
+
+def bundle_static(static_path):
+    """
+    Writes bundle.css and bundle.js in static_path, the stylesheets and
+    scripts of index.html joined, unless identical ones are there already.
+    """
+    for name, sources, separator in BUNDLES:
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_path, source), 'rb') as f:
+                data = f.read()
+            parts.append(_rebase_css(static_path, source, data) if name.endswith('.css') else data)
+        data = separator.join(parts)
+        target = os.path.join(static_path, name)
+        if os.path.isfile(target):
+            with open(target, 'rb') as f:
+                if f.read() == data:
+                    continue
+        replace_file(target, data)
+
+
+def ui_assets(static_path, bundled=True):
+    """
+    Returns the versioned urls of the stylesheets and of the scripts that
+    index.html loads: the bundles when bundled and written, or else the
+    files themselves.
+    """
+    if bundled and all(os.path.isfile(os.path.join(static_path, name)) for name, sources, separator in BUNDLES):
+        stylesheets, scripts = ('bundle.css',), ('bundle.js',)
+    else:
+        stylesheets, scripts = STYLESHEETS, SCRIPTS
+    return ([versioned_url(static_path, path) for path in stylesheets],
+            [versioned_url(static_path, path) for path in scripts])
@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+import hashlib
+import threading
+from collections import deque, OrderedDict
+from compress import compress
+
+__author__ = 'serena'
+
+
+def make_etag(body):
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+class SpecBody(object):
+    """
+    One serialized document and its compressed variants. Each variant is
+    compressed the first time a client accepts it and kept afterwards.
+    The digest that makes the ETag is the sha1 of data unless given.
+    """
+    def __init__(self, data, digest=None):
+        self.digest = digest or hashlib.sha1(data).hexdigest()
+        self.variants = {None: data}
+
+    def etag(self, encoding=None):
+        return '"%s-%s"' % (self.digest, encoding) if encoding else '"%s"' % self.digest
+
+    def has(self, encoding=None):
+        return encoding in self.variants
+
+    def data(self, encoding=None):
+        if encoding not in self.variants:
+            self.variants[encoding] = compress(self.variants[None], encoding)
+        return self.variants[encoding]
+
+
+class SpecEntry(object):
+    """
+    serialize(variant) returns the document as a SpecBody: variant is False for
+    compact json, True for pretty json, or the name of a binary format such as
+    'msgpack'. The compact json is made right away and the other variants the
+    first time they are asked for.
+    """
+    def __init__(self, serialize, tags=None, group=None):
+        self.serialize = serialize
+        self.tags = tags
+        self.group = group
+        self.compact = serialize(False)
+        self.variants = {}
+        self.created = time.time()
+
+    def has(self, pretty=False, fmt=None):
+        variant = fmt or bool(pretty)
+        return variant is False or variant in self.variants
+
+    def body(self, pretty=False, fmt=None):
+        variant = fmt or bool(pretty)
+        if variant is False:
+            return self.compact
+        body = self.variants.get(variant)
+        if body is None:
+            body = self.variants[variant] = self.serialize(variant)
+        return body
+
+
+class SpecCache(object):
+    """
+    Keeps the serialized specs so that they are built once and served many times.
+    The documents they are made from do not depend on the request host and are
+    kept too, so a new host only costs a serialization.
+
+    Entries and documents are stored with tags naming what they were built from,
+    such as ('resource', 'items'), ('model', 'Item') or the key of another
+    document; invalidate(tags) drops only what depends on one of them, and
+    whatever was stored without tags. Each invalidation bumps the generation
+    and is remembered in changes.
+
+    Specs are built off the IOLoop while handlers may be added on it: a build
+    runs with build(generation, ...), and what it stores is dropped if the
+    cache was invalidated since generation, as it may predate the change.
+
+    The entries of a group, such as the serializations of one document for
+    each base path, which comes from the Host header, are bounded: past
+    max_group_entries, the least recently used one is dropped.
+    """
+    def __init__(self, history=100, max_group_entries=16):
+        self.generation = 0
+        self.invalidated = time.time()
+        self.entries = {}
+        self.documents = {}
+        self.tagged = {}
+        # the keys of the entries of each group, least recently used first
+        self.groups = {}
+        self.max_group_entries = max_group_entries
+        self.changes = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def build(self, generation, build, *args):
+        """
+        Returns build(*args), storing what it caches only if the cache is
+        still at generation.
+        """
+        previous = self.built_at()
+        self.local.generation = generation
+        try:
+            return build(*args)
+        finally:
+            self.local.generation = previous
+
+    def built_at(self):
+        """
+        Returns the generation of the build running on this thread, or None.
+        """
+        return getattr(self.local, 'generation', None)
+
+    def _store(self, store, key, value, tags):
+        with self.lock:
+            generation = self.built_at()
+            if generation is None or generation == self.generation:
+                store[key] = value
+                self._tag(key, tags)
+                if store is self.entries and value.group is not None:
+                    self._add_to_group(key, value.group)
+        return value
+
+    def _add_to_group(self, key, group):
+        keys = self.groups.setdefault(group, OrderedDict())
+        keys.pop(key, None)
+        keys[key] = True
+        while len(keys) > self.max_group_entries:
+            evicted, _ = keys.popitem(last=False)
+            entry = self.entries.pop(evicted, None)
+            for tag in (entry.tags if entry is not None else None) or (None,):
+                keys_of_tag = self.tagged.get(tag)
+                if keys_of_tag is not None:
+                    keys_of_tag.discard(evicted)
+                    if not keys_of_tag:
+                        del self.tagged[tag]
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry.group is not None:
+            with self.lock:
+                keys = self.groups.get(entry.group)
+                if keys is not None and key in keys:
+                    del keys[key]
+                    keys[key] = True
+        return entry
+
+    def get_document(self, key):
+        return self.documents.get(key)
+
+    def set_document(self, key, document, tags=None):
+        return self._store(self.documents, key, document, tags)
+
+    def set(self, key, serialize, tags=None, group=None):
+        return self._store(self.entries, key, SpecEntry(serialize, tags, group), tags)
+
+    def _tag(self, key, tags):
+        for tag in tags or (None,):
+            self.tagged.setdefault(tag, set()).add(key)
+
+    def invalidate(self, tags=None):
+        """
+        Drops what depends on any of tags, or everything when tags is None.
+        """
+        with self.lock:
+            self.generation += 1
+            self.invalidated = time.time()
+            self.changes.append((self.generation, tags))
+            if tags is None:
+                self.entries.clear()
+                self.documents.clear()
+                self.tagged.clear()
+                self.groups.clear()
+                return
+            pending = list(tags) + [None]
+            while pending:
+                for key in self.tagged.pop(pending.pop(), ()):
+                    entry = self.entries.pop(key, None)
+                    if entry is not None and entry.group is not None:
+                        keys = self.groups.get(entry.group)
+                        if keys is not None:
+                            keys.pop(key, None)
+                            if not keys:
+                                del self.groups[entry.group]
+                    self.documents.pop(key, None)
+                    pending.append(key)
+
+    def changed_since(self, generation):
+        """
+        Returns the tags invalidated after generation, or None when everything
+        was, or when it is too old to tell.
+        """
+        tags = set()
+        if generation >= self.generation:
+            return tags
+        if not self.changes or self.changes[0][0] > generation + 1:
+            return None
+        for changed, changed_tags in self.changes:
+            if changed > generation:
+                if changed_tags is None:
+                    return None
+                tags.update(changed_tags)
+        return tags
+
+
+spec_cache = SpecCache()
@@ -0,0 +1,101 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import io
+import gzip
+import tempfile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+__author__ = 'serena'
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+COMPRESSIBLE_TYPES = ('.js', '.css')
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data)
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=9, mtime=0) as f:
+        f.write(data)
+    return buf.getvalue()
+
+
+def replace_file(path, data):
+    """
+    Writes data to path through a temporary file renamed over it, so that a
+    process reading path meanwhile gets the old or the new file, whole.
+    """
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory or '.', prefix='.%s.' % name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.rename(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def qualities(header):
+    """
+    Returns the q value of each item of an Accept or Accept-Encoding header,
+    lowercased: 1 when it has none, 0 when it is not a number.
+    """
+    result = {}
+    for item in (header or '').split(','):
+        parts = item.strip().split(';')
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        result[parts[0].strip().lower()] = quality
+    return result
+
+
+def accepted_encodings(accept_encoding):
+    """
+    Returns the encodings we can produce that the client accepts,
+    in our order of preference.
+    """
+    accepted = set(coding for coding, quality in qualities(accept_encoding).items() if quality > 0)
+    if '*' in accepted:
+        return list(ENCODINGS)
+    return [encoding for encoding in ENCODINGS if encoding in accepted]
+
+
+def negotiate(accept_encoding):
+    encodings = accepted_encodings(accept_encoding)
+    return encodings[0] if encodings else None
+
+
+def precompress_static(static_path):
+    """
+    Writes a .gz (and .br when brotli is installed) file next to every compressible
+    asset under static_path, unless an up-to-date one is already there.
+    """
+    for root, _, files in os.walk(static_path):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_TYPES):
+                continue
+            path = os.path.join(root, name)
+            mtime = os.path.getmtime(path)
+            data = None
+            for encoding in ENCODINGS:
+                target = path + EXTENSIONS[encoding]
+                if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                replace_file(target, compress(data, encoding))
@@ -0,0 +1,350 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+A small epytext parser for the fields understood by DocParser.
+
+It produces the same plaintext as epydoc's to_plaintext() for fields made of
+paragraphs, lists, literal blocks (after a paragraph ending with '::') and
+doctest blocks, with C{}, L{}, U{}, I{}, B{} and E{} inline markup, which is
+what the swagger docstrings use. Docstrings that epydoc would reject as
+malformed are parsed leniently instead of being dropped.
+"""
+import re
+from HTMLParser import HTMLParser
+
+__author__ = 'serena'
+
+FIELD_RE = re.compile(r'@(\w+)(?:[ \t]+([^:\n]*?))?[ \t]*:(.*)$')
+WRAP_RE = re.compile(r'( +|\n)')
+MARKUP_RE = re.compile(r'([ICBMLUEGSX])\{')
+BULLET_RE = re.compile(r'-( +|$)|(\d+[.])+( +|$)')
+TARGET_RE = re.compile(r'^(.*?)\s*<(?:URI:|URL:)?([^<>]+)>$')
+ESCAPES = {'lb': '{', 'rb': '}'}
+
+
+class Field(object):
+    def __init__(self, tag, arg, body, code=None, link=None):
+        self.tag = tag
+        self.arg = arg
+        self.body = body
+        self.code = code
+        self.link = link
+
+    def inline(self, tag):
+        return self.code if tag == 'code' else self.link
+
+
+def wordwrap(text, indent=0, right=75):
+    result = [' ' * indent]
+    index = indent
+    for chunk in WRAP_RE.split(text):
+        if (index + len(chunk) > right and index > 0) or chunk == '\n':
+            result.append('\n' + ' ' * indent)
+            index = indent
+            if chunk[:1] not in ('\n', ' '):
+                result.append(chunk)
+                index += len(chunk)
+        else:
+            result.append(chunk)
+            index += len(chunk)
+    return ''.join(result).rstrip() + '\n'
+
+
+def _parse_inline(text, field):
+    """
+    Strips the inline markup of a paragraph and records the contents
+    of the last C{} and the target of the last L{} on the field.
+    """
+    out = []
+    pos = 0
+    while True:
+        match = MARKUP_RE.search(text, pos)
+        if match is None:
+            out.append(text[pos:])
+            return ''.join(out)
+
+        out.append(text[pos:match.start()])
+        depth = 1
+        end = match.end()
+        while end < len(text) and depth:
+            if text[end] == '{':
+                depth += 1
+            elif text[end] == '}':
+                depth -= 1
+            end += 1
+        markup = match.group(1)
+        content = _parse_inline(text[match.end():end - 1 if not depth else end], field)
+        if markup == 'E':
+            content = ESCAPES.get(content, content)
+        elif markup == 'C':
+            field.code = content
+        elif markup == 'L':
+            name, _, target = content.partition('<')
+            if target.endswith('>'):
+                content, field.link = name.strip(), target[:-1].strip()
+            else:
+                field.link = content
+        elif markup == 'U':
+            content = _uri(content)
+        out.append(content)
+        pos = end
+
+
+def _uri(content):
+    """
+    Returns a U{} as epydoc prints it: <target>, or 'name'<target>; a target
+    without a scheme is taken as http or mailto.
+    """
+    match = TARGET_RE.match(content)
+    name, target = match.groups() if match else (content, content)
+    target = re.sub(r'\s', '', target)
+    if not re.match(r'\w+:', target):
+        target = ('mailto:' if re.match(r'\w+@(\w+)(\.\w+)*', target) else 'http://') + target
+    return '<%s>' % target if name == target else '%r<%s>' % (name, target)
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip())
+
+
+def _tokenize_item(lines, start, bullet_indent, text_start, tokens):
+    """
+    Adds the first paragraph of a field or list item, from text_start of
+    lines[start], and returns the index of the line after it.
+    """
+    end = start + 1
+    para_indent = None
+    doublecolon = lines[start].rstrip()[-2:] == '::'
+    while end < len(lines) and not doublecolon:
+        line = lines[end]
+        indent = _indent(line)
+        doublecolon = line.rstrip()[-2:] == '::'
+        if indent == len(line) or indent < bullet_indent or BULLET_RE.match(line, indent):
+            break
+        if para_indent is None:
+            para_indent = indent
+        if indent != para_indent:
+            break
+        end += 1
+    text = ' '.join([lines[start][text_start:].strip()] + [line.strip() for line in lines[start + 1:end]]).strip()
+    if text:
+        tokens.append(['para', text, para_indent])
+    return end
+
+
+def _tokenize_para(lines, start, para_indent, tokens):
+    end = start + 1
+    doublecolon = lines[start].rstrip()[-2:] == '::'
+    while end < len(lines) and not doublecolon:
+        line = lines[end]
+        indent = _indent(line)
+        doublecolon = line.rstrip()[-2:] == '::'
+        if indent == len(line) or indent != para_indent or BULLET_RE.match(line, indent):
+            break
+        end += 1
+    tokens.append(['para', ' '.join(line.strip() for line in lines[start:end]), para_indent])
+    return end
+
+
+def _tokenize_literal(lines, start, block_indent, tokens):
+    end = start + 1
+    while end < len(lines) and not (lines[end].strip() and _indent(lines[end]) <= block_indent):
+        end += 1
+    text = '\n'.join(line[block_indent + 1:] for line in lines[start:end])
+    tokens.append(['literal', re.sub(r'(\A[ \n]*\n)|(\n[ \n]*\Z)', '', text), block_indent])
+    return end
+
+
+def _tokenize_doctest(lines, start, block_indent, tokens):
+    end = start + 1
+    min_indent = block_indent
+    while end < len(lines) and lines[end].strip():
+        min_indent = min(min_indent, _indent(lines[end]))
+        end += 1
+    tokens.append(['doctest', '\n'.join(line[min_indent:] for line in lines[start:end]), block_indent])
+    return end
+
+
+def _tokenize(lines, field_indent, text_start):
+    """
+    Splits the lines of a field into blocks the way epydoc's tokenizer does:
+    ['para' | 'literal' | 'doctest' | 'bullet', text, indent].
+    """
+    tokens = []
+    end = _tokenize_item(lines, 0, field_indent, text_start, tokens)
+    indent = tokens[-1][2] if tokens and tokens[-1][2] is not None else field_indent
+    while True:
+        if tokens and tokens[-1][0] == 'para' and tokens[-1][1][-2:] == '::':
+            # a paragraph ending with '::' is followed by a literal block
+            tokens[-1][1] = tokens[-1][1][:-1]
+            end = _tokenize_literal(lines, end, indent, tokens)
+        while end < len(lines) and not lines[end].strip():
+            end += 1
+        if end == len(lines):
+            return tokens
+        line = lines[end]
+        indent = _indent(line)
+        bullet = BULLET_RE.match(line, indent)
+        if line[indent:indent + 4] == '>>> ':
+            end = _tokenize_doctest(lines, end, indent, tokens)
+        elif bullet:
+            tokens.append(['bullet', line[indent:bullet.end()].strip(), indent])
+            end = _tokenize_item(lines, end, indent, bullet.end(), tokens)
+            if tokens[-1][2] is not None:
+                indent = tokens[-1][2]
+        else:
+            end = _tokenize_para(lines, end, indent, tokens)
+
+
+class Block(object):
+    __slots__ = ('tag', 'bullet', 'children')
+
+    def __init__(self, tag, bullet=None):
+        self.tag = tag
+        self.bullet = bullet
+        self.children = []
+
+
+def _new_list(top, tag, bullet):
+    if top.tag != tag:
+        return True
+    if tag == 'olist':
+        previous, current = top.children[-1].bullet.split('.')[:-1], bullet.split('.')[:-1]
+        return previous[:-1] != current[:-1] or int(current[-1]) != int(previous[-1]) + 1
+    return False
+
+
+def _completed(kind, indent, top, indents):
+    """
+    Tells whether a block ends before the next one: when that is dedented past
+    it, is the next item of its list, or is not a list item at all.
+    """
+    if indent < (indents[-1] if indents[-1] is not None else indents[-2]):
+        return True
+    if kind == 'bullet' and indent == indents[-2] and top.tag == 'li':
+        return True
+    return top.tag in ('ulist', 'olist') and kind != 'bullet'
+
+
+def _structure(tokens, field_indent):
+    """
+    Nests the blocks of a field into lists and list items by their
+    indentation, as epydoc does.
+    """
+    field = Block('field')
+    stack, indents = [field], [field_indent, None]
+    for kind, text, indent in tokens:
+        while indent is not None and len(stack) > 1 and _completed(kind, indent, stack[-1], indents):
+            stack.pop()
+            indents.pop()
+        if kind == 'bullet':
+            tag = 'olist' if text[-1] == '.' else 'ulist'
+            if _new_list(stack[-1], tag, text):
+                if stack[-1].tag in ('ulist', 'olist'):
+                    stack.pop()
+                    indents.pop()
+                stack[-1].children.append(Block(tag))
+                stack.append(stack[-1].children[-1])
+                indents.append(indent)
+            stack[-1].children.append(Block('li', text if tag == 'olist' else None))
+            stack.append(stack[-1].children[-1])
+            indents.append(None)
+        else:
+            if kind == 'para' and indents[-1] is None:
+                indents[-1] = indent
+            stack[-1].children.append((kind, text))
+    return field
+
+
+def _plaintext(block, field, indent=0):
+    """
+    Prints a block as epydoc's to_plaintext() does, recording the C{} and
+    L{} of its paragraphs on field.
+    """
+    if isinstance(block, tuple):
+        kind, text = block
+        if kind == 'para':
+            return wordwrap(_parse_inline(text, field), indent) + '\n'
+        prefix = ' ' * (indent + (2 if kind == 'doctest' else 1))
+        return '\n'.join(prefix + line for line in text.split('\n')) + '\n\n'
+    if block.tag == 'field':
+        child_indent = indent
+    elif block.tag == 'li' and block.bullet:
+        child_indent = indent + 1 + len(block.bullet)
+    else:
+        child_indent = indent + 2
+    text = ''.join(_plaintext(child, field, child_indent) for child in block.children)
+    if block.tag == 'li':
+        return ' ' * indent + (block.bullet or '-') + ' ' + text.lstrip()
+    if block.tag in ('ulist', 'olist'):
+        return text.replace('\n\n', '\n') + '\n'
+    return text
+
+
+def _make_field(tag, arg, lines, indent, text_start):
+    field = Field(tag.lower(), arg or None, '')
+    field.body = _plaintext(_structure(_tokenize(lines, indent, text_start), indent), field)
+    return field
+
+
+def parse_fields(text):
+    fields = []
+    current = None
+    indent = None
+    for line in text.expandtabs().split('\n'):
+        stripped = line.lstrip()
+        match = FIELD_RE.match(stripped) if stripped.startswith('@') else None
+        if match and (indent is None or len(line) - len(stripped) <= indent):
+            if current is not None:
+                fields.append(_make_field(*current))
+            indent = len(line) - len(stripped)
+            current = (match.group(1), match.group(2), [line], indent, indent + match.start(3))
+        elif current is not None:
+            current[2].append(line)
+    if current is not None:
+        fields.append(_make_field(*current))
+    return fields
+
+
+class EpytextParser(HTMLParser):
+    a_text = False
+
+    def __init__(self, tag):
+        HTMLParser.__init__(self)
+        self.tag = tag
+        self.data = None
+
+    def handle_starttag(self, tag, attr):
+        if tag == self.tag:
+            self.a_text = True
+
+    def handle_endtag(self, tag):
+        if tag == self.tag:
+            self.a_text = False
+
+    def handle_data(self, data):
+        if self.a_text:
+            self.data = data
+
+    def get_data(self):
+        return self.data
+
+
+def _parse_epydoc_inline(tag, body):
+    epytextParser = EpytextParser(tag)
+    epytextParser.feed(str(body))
+    data = epytextParser.get_data()
+    epytextParser.close()
+    return data
+
+
+def parse_fields_epydoc(text):
+    import epydoc.markup
+
+    errors = []
+    doc = epydoc.markup.parse(text, markup='epytext', errors=errors)
+    _, fields = doc.split_fields(errors)
+    return [Field(field.tag(), field.arg(), field.body().to_plaintext(None),
+                  _parse_epydoc_inline('code', field.body()),
+                  _parse_epydoc_inline('link', field.body()))
+            for field in fields]
@@ -0,0 +1,70 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from compress import qualities
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+__author__ = 'serena'
+
+JSON_TYPE = 'application/json'
+
+# the binary formats we can produce, by the media types that ask for them
+MEDIA_TYPES = OrderedDict()
+if msgpack:
+    MEDIA_TYPES['application/msgpack'] = 'msgpack'
+    MEDIA_TYPES['application/x-msgpack'] = 'msgpack'
+if cbor2:
+    MEDIA_TYPES['application/cbor'] = 'cbor'
+CONTENT_TYPES = {'msgpack': 'application/msgpack', 'cbor': 'application/cbor'}
+
+
+def _text_strings(value):
+    """
+    Returns a copy of value with its byte strings decoded, since CBOR tells
+    text from bytes.
+    """
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    if isinstance(value, dict):
+        return dict((_text_strings(key), _text_strings(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_text_strings(item) for item in value]
+    return value
+
+
+def encode(document, fmt):
+    if fmt == 'msgpack':
+        # str is text on Python 2
+        return msgpack.packb(document, use_bin_type=False)
+    return cbor2.dumps(_text_strings(document))
+
+
+def negotiate_format(accept):
+    """
+    Returns the binary format that accept prefers to json, by its q values,
+    or None for json, which wins ties and is the default.
+    """
+    if not MEDIA_TYPES or not accept:
+        return None
+    accepted = qualities(accept)
+
+    def quality(media_type):
+        for media_range in (media_type, media_type.split('/')[0] + '/*', '*/*'):
+            if media_range in accepted:
+                return accepted[media_range]
+        return 0.0
+
+    best, best_quality = None, quality(JSON_TYPE)
+    for media_type, fmt in MEDIA_TYPES.items():
+        if media_type in accepted and accepted[media_type] > best_quality:
+            best, best_quality = fmt, accepted[media_type]
+    return best
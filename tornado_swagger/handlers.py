@@ -1,9 +1,11 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
-from tornado.web import URLSpec, StaticFileHandler
+from tornado.web import URLSpec
 
 from settings import *
 from views import *
+from compress import precompress_static
+from bundle import bundle_static
 
 __author__ = 'serena'
 
@@ -12,9 +14,35 @@ def swagger_handlers():
     prefix = default_settings.get('swagger_prefix', '/swagger')
     if prefix[-1] != '/':
         prefix += '/'
+    if default_settings.get('bundle_static'):
+        try:
+            bundle_static(default_settings.get('static_path'))
+        except (IOError, OSError):
+            pass
+    if default_settings.get('precompress_static'):
+        try:
+            precompress_static(default_settings.get('static_path'))
+        except (IOError, OSError):
+            pass
+    spec_path = default_settings.get('spec_path')
+    if spec_path:
+        spec_handlers = [
+            URLSpec(prefix + r'spec.json$',     SwaggerSpecFileHandler,  {'path': spec_path, 'filename': 'resources.json'}, name=URL_SWAGGER_API_LIST),
+            URLSpec(prefix + r'spec$',          SwaggerSpecFileHandler,  {'path': spec_path, 'filename': 'spec.json'}, name=URL_SWAGGER_API_SPEC),
+            URLSpec(prefix + r'spec/([^/]+)$',  SwaggerSpecFileHandler,  {'path': spec_path, 'filename': 'spec/%s.json'}, name=URL_SWAGGER_API_RESOURCE),
+        ]
+    else:
+        spec_handlers = [
+            URLSpec(prefix + r'spec.json$',     SwaggerResourcesHandler, default_settings, name=URL_SWAGGER_API_LIST),
+            URLSpec(prefix + r'spec$',          SwaggerApiHandler,       default_settings, name=URL_SWAGGER_API_SPEC),
+            URLSpec(prefix + r'spec/([^/]+)$',  SwaggerApiHandler,       default_settings, name=URL_SWAGGER_API_RESOURCE),
+            URLSpec(prefix + r'changes$',       SwaggerChangesHandler,   default_settings, name=URL_SWAGGER_API_CHANGES),
+        ]
+    if default_settings.get('metrics'):
+        spec_handlers.append(
+            URLSpec(prefix + r'metrics$',       SwaggerMetricsHandler,   default_settings, name=URL_SWAGGER_API_METRICS))
     return [
         URLSpec(prefix + r'spec.html$',         SwaggerUIHandler,        default_settings, name=URL_SWAGGER_API_DOCS),
-        URLSpec(prefix + r'spec.json$',         SwaggerResourcesHandler, default_settings, name=URL_SWAGGER_API_LIST),
-        URLSpec(prefix + r'spec$',              SwaggerApiHandler,       default_settings, name=URL_SWAGGER_API_SPEC),
-        (prefix + r'(.*\.(css|png|gif|js))',    StaticFileHandler,       {'path': default_settings.get('static_path')}),
+    ] + spec_handlers + [
+        (prefix + r'(.*\.(css|png|gif|js))',    SwaggerStaticFileHandler, {'path': default_settings.get('static_path')}),
     ]
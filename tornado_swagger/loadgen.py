@@ -0,0 +1,337 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Load-tests every documented operation of an application from its spec:
+
+    python -m tornado_swagger.loadgen myapp:application -n 200 -c 20
+    python -m tornado_swagger.loadgen --spec spec.json --base-url http://localhost:8888
+
+The requests are synthesized from the parameters and models of the spec, sent
+concurrently with AsyncHTTPClient, and the latency percentiles and rate of
+each operation reported, both sent in turns with the others and on its own. Given an application, it is served in-process on a
+local port and its spec built by SwaggerApiHandler.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+from urllib import urlencode, quote
+import urlparse
+from tornado import gen
+from tornado.escape import utf8
+from tornado.httpclient import AsyncHTTPClient, HTTPClient, HTTPRequest
+from tornado.ioloop import IOLoop
+from settings import default_settings
+from views import SwaggerApiHandler, json_dumps
+from validation import INTEGER_TYPES, NUMBER_TYPES, BOOLEAN_TYPES
+
+__author__ = 'serena'
+
+BODY_METHODS = ('POST', 'PUT', 'PATCH')
+
+# a sample of each type, as a string in urls and forms
+SAMPLES = {'date': '2016-01-01', 'date-time': '2016-01-01T00:00:00Z', 'datetime': '2016-01-01T00:00:00Z'}
+SAMPLES.update(dict.fromkeys(INTEGER_TYPES, 1))
+SAMPLES.update(dict.fromkeys(NUMBER_TYPES, 1.5))
+SAMPLES.update(dict.fromkeys(BOOLEAN_TYPES, True))
+
+
+class Target(object):
+    """
+    One synthesized request, for the operation method path.
+    """
+    __slots__ = ('nickname', 'method', 'path', 'url', 'headers', 'body')
+
+    def __init__(self, nickname, method, path, url, headers, body):
+        self.nickname = nickname
+        self.method = method
+        self.path = path
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+    def request(self, timeout):
+        body = self.body
+        if body is None and self.method in BODY_METHODS:
+            body = b''
+        return HTTPRequest(self.url, self.method, self.headers, body, request_timeout=timeout,
+                           allow_nonstandard_methods=body is not None and self.method not in BODY_METHODS)
+
+
+class Sampler(object):
+    """
+    Makes valid values of the types and models of a spec.
+    """
+    def __init__(self, models):
+        self.models = models
+
+    def value(self, data_type, items=None, stack=()):
+        if data_type in SAMPLES:
+            return SAMPLES[data_type]
+        if data_type in self.models:
+            return self.model(data_type, stack)
+        if data_type in ('array', 'list', 'set'):
+            items = items or {}
+            item_type = items.get('type') or items.get('$ref')
+            if item_type in stack:
+                return []
+            return [self.value(item_type, None, stack)] if item_type else []
+        return 'example'
+
+    def model(self, model_id, stack=()):
+        """
+        Returns a json object with every property of model_id; the properties
+        of a model that is being sampled already are left out, or null when
+        required, so that recursive models end.
+        """
+        spec = self.models[model_id]
+        required = set(spec.get('required') or ())
+        stack += (model_id,)
+        data = {}
+        for name, prop in spec.get('properties', {}).items():
+            ref = prop.get('type') or prop.get('$ref')
+            if prop.get('default') is not None:
+                data[name] = prop['default']
+            elif ref in stack:
+                if name in required:
+                    data[name] = None
+            else:
+                data[name] = self.value(ref, prop.get('items'), stack)
+        return data
+
+    def text(self, data_type, param_type=None):
+        value = self.value(data_type)
+        if param_type == 'path' and not isinstance(value, (int, float)):
+            # path arguments are often matched as digits
+            return '1'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (dict, list)):
+            return json.dumps(value)
+        return utf8(value if isinstance(value, basestring) else repr(value))
+
+
+def synthesize(spec, base_url=None):
+    """
+    Returns a Target for each operation of spec, with a value for each of its
+    parameters, required or not. base_url defaults to the basePath of spec.
+    """
+    base_url = (base_url or spec.get('basePath') or '').rstrip('/')
+    sampler = Sampler(spec.get('models') or {})
+    targets = []
+    for api in spec.get('apis', []):
+        for operation in api.get('operations', []):
+            path = api['path']
+            query, form, headers, body = [], [], {}, None
+            for param in operation.get('parameters', []):
+                name, data_type, param_type = param['name'], param.get('dataType'), param.get('paramType')
+                if param_type == 'path':
+                    path = path.replace('{%s}' % name, quote(sampler.text(data_type, 'path'), safe=''))
+                elif param_type == 'query':
+                    query.append((name, sampler.text(data_type)))
+                elif param_type == 'header':
+                    headers[name] = sampler.text(data_type)
+                elif param_type == 'form':
+                    form.append((name, sampler.text(data_type)))
+                elif param_type == 'body':
+                    body = utf8(json.dumps(sampler.value(data_type, param.get('items'))))
+                    headers['Content-Type'] = 'application/json'
+            if form and body is None:
+                body = urlencode(form)
+                headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            url = base_url + path + ('?' + urlencode(query) if query else '')
+            targets.append(Target(operation.get('nickname'), operation['httpMethod'].upper(), api['path'], url,
+                                  headers, body))
+    return targets
+
+
+class OperationStats(object):
+    __slots__ = ('timings', 'statuses', 'elapsed')
+
+    def __init__(self):
+        self.timings = []
+        self.statuses = {}
+        self.elapsed = None
+
+    def add(self, elapsed, code):
+        self.timings.append(elapsed)
+        self.statuses[code] = self.statuses.get(code, 0) + 1
+
+    def percentile(self, q):
+        ordered = sorted(self.timings)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+    def rate(self):
+        """
+        Completed requests per second over the run this operation was sent in.
+        """
+        return round(len(self.timings) / self.elapsed, 1) if self.elapsed else None
+
+
+@gen.coroutine
+def drive(targets, requests=100, concurrency=10, timeout=20.0, warm_up=True):
+    """
+    Sends requests requests of each of targets, concurrency at a time, in
+    turns, and returns (stats by target, elapsed seconds); the rate of each
+    target is counted over the elapsed time of the whole run. With warm_up each
+    target is sent once beforehand, untimed, so that lazy work on the server
+    side is left out.
+    """
+    client = AsyncHTTPClient(max_clients=concurrency)
+    if warm_up:
+        yield [client.fetch(target.request(timeout), raise_error=False) for target in targets]
+
+    stats = dict((target, OperationStats()) for target in targets)
+    schedule = itertools.islice(itertools.cycle(targets), requests * len(targets))
+
+    @gen.coroutine
+    def worker():
+        for target in schedule:
+            start = time.time()
+            response = yield client.fetch(target.request(timeout), raise_error=False)
+            stats[target].add(time.time() - start, response.code)
+
+    start = time.time()
+    yield [worker() for _ in range(concurrency)]
+    elapsed = time.time() - start
+    for operation in stats.values():
+        operation.elapsed = elapsed
+    raise gen.Return((stats, elapsed))
+
+
+@gen.coroutine
+def drive_each(targets, requests=100, concurrency=10, timeout=20.0):
+    """
+    Sends each of targets on its own, one after the other, as drive() does,
+    and returns the stats by target, each with the rate of its own phase.
+    """
+    stats = {}
+    for target in targets:
+        phase, _ = yield drive([target], requests, concurrency, timeout, warm_up=False)
+        stats.update(phase)
+    raise gen.Return(stats)
+
+
+def report(targets, stats, alone=None):
+    """
+    Returns a row for each target: its operation, the number of requests and
+    of errors (status 400 and over, or 599 for no response), the p50, p95 and
+    p99 latency in ms and the requests per second while sent in turns with
+    the others. alone are the stats of drive_each(), whose rate is added as
+    alone_rps.
+    """
+    rows = []
+    for target in targets:
+        operation = stats[target]
+        count = len(operation.timings)
+        rows.append({
+            'operation': '%s %s' % (target.method, target.path),
+            'nickname': target.nickname,
+            'requests': count,
+            'errors': sum(n for code, n in operation.statuses.items() if code >= 400),
+            'statuses': dict((str(code), n) for code, n in operation.statuses.items()),
+            'p50_ms': round(operation.percentile(0.5) * 1000, 3) if count else None,
+            'p95_ms': round(operation.percentile(0.95) * 1000, 3) if count else None,
+            'p99_ms': round(operation.percentile(0.99) * 1000, 3) if count else None,
+            'rps': operation.rate(),
+            'alone_rps': alone[target].rate() if alone else None,
+        })
+    return rows
+
+
+def requests_per_second(rows, elapsed):
+    return round(sum(row['requests'] for row in rows) / elapsed, 1) if elapsed else None
+
+
+def format_report(rows, elapsed):
+    width = max([len(row['operation']) for row in rows] + [9])
+    lines = ['%-*s %9s %7s %9s %9s %9s %9s %9s' % (width, 'operation', 'requests', 'errors', 'p50 ms', 'p95 ms',
+                                                   'p99 ms', 'rps', 'alone rps')]
+    for row in rows:
+        alone_rps = '-' if row['alone_rps'] is None else row['alone_rps']
+        lines.append('%-*s %9d %7d %9s %9s %9s %9s %9s' % (width, row['operation'], row['requests'], row['errors'],
+                                                           row['p50_ms'], row['p95_ms'], row['p99_ms'], row['rps'],
+                                                           alone_rps))
+    lines.append('%d requests in %.2f s, %.1f per second' % (sum(row['requests'] for row in rows), elapsed,
+                                                           requests_per_second(rows, elapsed) or 0))
+    return '\n'.join(lines)
+
+
+def load_spec(source):
+    """
+    Reads a spec from a json file, or from a url such as
+    http://localhost:8888/swagger/spec.
+    """
+    if urlparse.urlparse(source).scheme in ('http', 'https'):
+        return json.loads(HTTPClient().fetch(source).body)
+    with open(source) as f:
+        return json.load(f)
+
+
+def serve(application):
+    """
+    Serves application on a free local port of the current IOLoop and returns
+    its base url and the spec of all its apis, as SwaggerApiHandler builds it.
+    """
+    from tornado.httpserver import HTTPServer
+    from tornado.testing import bind_unused_port
+
+    sock, port = bind_unused_port()
+    HTTPServer(application).add_sockets([sock])
+    base_url = 'http://127.0.0.1:%d' % port
+    base_path = urlparse.urljoin(base_url, default_settings['base_url'])[:-1]
+    document = SwaggerApiHandler.build_spec(application, default_settings['api_version'],
+                                            default_settings['exclude_namespaces'], base_path, None, '127.0.0.1')
+    return base_url, json.loads(json_dumps(document))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tornado_swagger.loadgen',
+                                     description='Load-test the documented operations of an application.')
+    parser.add_argument('application', nargs='?',
+                        help="the application to serve in-process and test, as 'module:attribute'")
+    parser.add_argument('--spec', help='a spec file or url to read the operations from instead')
+    parser.add_argument('-b', '--base-url', help='where to send the requests (default: the basePath of the spec)')
+    parser.add_argument('-n', '--requests', type=int, default=100, help='requests per operation (default: 100)')
+    parser.add_argument('-c', '--concurrency', type=int, default=10, help='concurrent requests (default: 10)')
+    parser.add_argument('-t', '--timeout', type=float, default=20.0, help='request timeout in seconds')
+    parser.add_argument('-o', '--operation', action='append', default=[],
+                        help='only test the operations of this nickname (repeatable)')
+    parser.add_argument('--no-each', dest='each', action='store_false',
+                        help='skip sending each operation on its own after the run of all of them')
+    parser.add_argument('--json', dest='json_output', help='file to write the report to, json')
+    args = parser.parse_args(argv)
+    if bool(args.application) == bool(args.spec):
+        parser.error('give either an application or --spec')
+
+    if args.application:
+        from build import load_application
+
+        sys.path.insert(0, os.getcwd())
+        base_url, spec = serve(load_application(args.application))
+    else:
+        base_url, spec = None, load_spec(args.spec)
+    targets = synthesize(spec, args.base_url or base_url)
+    if args.operation:
+        targets = [target for target in targets if target.nickname in args.operation]
+    if not targets:
+        parser.error('no documented operations to test')
+
+    stats, elapsed = IOLoop.current().run_sync(
+        lambda: drive(targets, args.requests, args.concurrency, args.timeout))
+    alone = None
+    if args.each:
+        alone = IOLoop.current().run_sync(lambda: drive_each(targets, args.requests, args.concurrency, args.timeout))
+    rows = report(targets, stats, alone)
+    print(format_report(rows, elapsed))
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump({'requests': args.requests, 'concurrency': args.concurrency, 'elapsed': elapsed,
+                       'requests_per_second': requests_per_second(rows, elapsed), 'operations': rows},
+                      f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from registry import operations_index
+
+__author__ = 'serena'
+
+# upper bounds of the latency buckets, in seconds; one more bucket counts the rest
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class OperationMetrics(object):
+    """
+    Counts the responses of one operation by status code and their latency in
+    the fixed BUCKETS. Only updated from the IOLoop, so it needs no locking.
+    """
+    __slots__ = ('nickname', 'method', 'count', 'sum', 'statuses', 'buckets')
+
+    def __init__(self, nickname, method):
+        self.nickname = nickname
+        self.method = method
+        self.count = 0
+        self.sum = 0.0
+        self.statuses = {}
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, status, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    @property
+    def errors(self):
+        return sum(count for status, count in self.statuses.items() if status >= 500)
+
+    def quantile(self, q):
+        """
+        Estimates the q-quantile of the latency in seconds, interpolating within
+        its bucket as Prometheus' histogram_quantile() does.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                if index == len(BUCKETS):
+                    return BUCKETS[-1]
+                lower = BUCKETS[index - 1] if index else 0.0
+                return lower + (BUCKETS[index] - lower) * (rank - seen) / count
+            seen += count
+        return BUCKETS[-1]
+
+
+class Metrics(object):
+    """
+    The metrics of the documented operations, by nickname and http method.
+    observe(handler) is called once a request is finished; undocumented
+    handlers and methods are ignored.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self.operations = OrderedDict()
+
+    def observe(self, handler):
+        method = handler.request.method
+        api = operations_index.find(type(handler), method)
+        if api is None:
+            return
+        key = api.nickname or api.func.__name__, method
+        metrics = self.operations.get(key)
+        if metrics is None:
+            metrics = self.operations[key] = OperationMetrics(*key)
+        metrics.observe(handler.get_status(), handler.request.request_time())
+
+    def clear(self):
+        self.started = time.time()
+        self.operations.clear()
+
+    def snapshot(self):
+        uptime = time.time() - self.started
+        operations = []
+        for metrics in self.operations.values():
+            p50, p99 = metrics.quantile(0.5), metrics.quantile(0.99)
+            operations.append({
+                'nickname': metrics.nickname,
+                'method': metrics.method,
+                'count': metrics.count,
+                'errors': metrics.errors,
+                'statuses': dict((str(status), count) for status, count in metrics.statuses.items()),
+                'rate': round(metrics.count / uptime, 3) if uptime else None,
+                'sum': round(metrics.sum, 6),
+                'buckets': list(metrics.buckets),
+                'p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                'p99_ms': round(p99 * 1000, 1) if p99 is not None else None,
+            })
+        return {'uptime': round(uptime, 3), 'buckets': list(BUCKETS), 'operations': operations}
+
+    def prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = [
+            '# HELP swagger_operation_requests_total Requests answered by each documented operation.',
+            '# TYPE swagger_operation_requests_total counter',
+        ]
+        for metrics in self.operations.values():
+            labels = _labels(nickname=metrics.nickname, method=metrics.method)
+            for status in sorted(metrics.statuses):
+                lines.append('swagger_operation_requests_total{%s,code="%d"} %d'
+                             % (labels, status, metrics.statuses[status]))
+        lines += [
+            '# HELP swagger_operation_duration_seconds Latency of each documented operation.',
+            '# TYPE swagger_operation_duration_seconds histogram',
+        ]
+        for metrics in self.operations.values():
+            labels = _labels(nickname=metrics.nickname, method=metrics.method)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), metrics.buckets):
+                cumulative += count
+                lines.append('swagger_operation_duration_seconds_bucket{%s,le="%s"} %d' % (labels, bound, cumulative))
+            lines.append('swagger_operation_duration_seconds_sum{%s} %r' % (labels, metrics.sum))
+            lines.append('swagger_operation_duration_seconds_count{%s} %d' % (labels, metrics.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    return ','.join('%s="%s"' % (name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                    for name, value in sorted(labels.items()))
+
+
+metrics = Metrics()
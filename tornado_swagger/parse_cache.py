@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import os
+import sys
+import atexit
+import hashlib
+import marshal
+import tempfile
+
+__author__ = 'serena'
+
+FORMAT = 1
+
+# the results depend on the code of the parser as well
+PARSER_SOURCES = ('swagger.py', 'epytext.py')
+
+
+def _parser_digest():
+    digest = hashlib.sha1(str(FORMAT).encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in PARSER_SOURCES:
+        try:
+            with open(os.path.join(directory, name), 'rb') as f:
+                digest.update(f.read())
+        except (IOError, OSError):
+            digest.update(name.encode())
+    return digest.digest()
+
+
+def signature(func):
+    """
+    Returns the names of the positional arguments of func and its defaults,
+    read from its code without inspect, or None when it has no code.
+    """
+    func = getattr(func, '__func__', func)
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return None
+    return code.co_varnames[:code.co_argcount], getattr(func, '__defaults__', None)
+
+
+class ParseCache(object):
+    """
+    Keeps the parsed fields of the operations and models of previous runs in
+    directory, in a single marshal file read at once when the first of them is
+    decorated. Each entry is keyed by the sha1 of what its parsing depends on:
+    the docstring, the signature, the parser and its code; a changed one gets
+    a new key and is parsed again.
+
+    Only the entries of the objects decorated in this process are written back,
+    on warm_up() or at exit, so the stale ones are dropped: use one directory
+    per application.
+    """
+    def __init__(self):
+        self.directory = None
+        self.header = None
+        self.entries = {}
+        self.live = set()
+        self.dirty = False
+        self.registered = False
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, 'parse-cache-py%d%d.marshal' % sys.version_info[:2])
+
+    def open(self, directory):
+        if directory == self.directory:
+            return
+        self.directory = directory
+        self.header = _parser_digest()
+        self.entries = {}
+        self.live = set()
+        self.dirty = False
+        try:
+            with open(self.path, 'rb') as f:
+                header, entries = marshal.loads(f.read())
+            if header == self.header:
+                self.entries = entries
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            pass
+        if not self.registered:
+            self.registered = True
+            atexit.register(self.save)
+
+    def key(self, directory, kind, doc, func, parser):
+        """
+        Returns the key of the entry of an object of kind, or None when
+        directory is not set or its signature cannot be stored.
+        """
+        if not directory:
+            return None
+        self.open(directory)
+        try:
+            data = marshal.dumps((kind, doc, signature(func) if func is not None else None, parser))
+        except ValueError:
+            # defaults marshal cannot store
+            return None
+        key = hashlib.sha1(data).digest()
+        self.live.add(key)
+        return key
+
+    def get(self, key):
+        return self.entries.get(key) if key is not None else None
+
+    def put(self, key, entry):
+        if key is not None:
+            self.entries[key] = entry
+            self.dirty = True
+
+    def save(self):
+        """
+        Writes the entries of the objects decorated in this process, when any
+        was parsed, replacing the file at once so that concurrent workers do
+        not read it half written.
+        """
+        if not self.dirty or not self.directory:
+            return
+        entries = dict((key, entry) for key, entry in self.entries.items() if key in self.live)
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump((self.header, entries), f)
+            os.chmod(temp_path, 0o644)
+            os.rename(temp_path, self.path)
+        except (IOError, OSError, ValueError):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self.dirty = False
+
+
+parse_cache = ParseCache()
@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import weakref
+from collections import OrderedDict
+
+__author__ = 'serena'
+
+
+class OperationIndex(object):
+    """
+    Maps a handler class to its decorated operations, sorted by method name.
+    A class is indexed the first time it is seen, walking its MRO once, so that
+    discovery costs a dictionary lookup per URLSpec afterwards.
+    """
+    def __init__(self):
+        self.classes = {}
+        self.methods = {}
+
+    def get(self, handler_class):
+        try:
+            return self.classes[handler_class]
+        except KeyError:
+            operations = self.classes[handler_class] = self._index(handler_class)
+            return operations
+
+    def find(self, handler_class, method):
+        """
+        Returns the operation that answers method, e.g. 'GET', on handler_class,
+        or None when it is not documented.
+        """
+        try:
+            return self.methods[handler_class, method]
+        except KeyError:
+            found = None
+            for api in self.get(handler_class):
+                if api.func.__name__.upper() == method:
+                    found = api
+            self.methods[handler_class, method] = found
+            return found
+
+    def clear(self):
+        self.classes.clear()
+        self.methods.clear()
+
+    @staticmethod
+    def _index(handler_class):
+        members = {}
+        for klass in reversed(getattr(handler_class, '__mro__', (handler_class,))):
+            for name, member in vars(klass).items():
+                if hasattr(member, 'rest_api'):
+                    members[name] = member.rest_api
+                else:
+                    members.pop(name, None)
+        return [members[name] for name in sorted(members)]
+
+
+class ModelRegistry(object):
+    """
+    Maps model ids to the classes decorated with @swagger.model, which carry
+    their model as rest_model. The classes are held weakly, so one that is
+    garbage collected, e.g. after its module was reloaded, leaves the registry.
+    Registering a class again is ignored, while another class with the same
+    id replaces it.
+    """
+    def __init__(self):
+        self.classes = weakref.WeakValueDictionary()
+
+    def add(self, model):
+        """
+        Returns False when the class of model was registered already.
+        """
+        if self.classes.get(model.id) is model.cls:
+            return False
+        model.cls.rest_model = model
+        self.classes[model.id] = model.cls
+        return True
+
+    def get(self, model_id):
+        cls = self.classes.get(model_id)
+        return cls.rest_model if cls is not None else None
+
+    def __len__(self):
+        return len(self.classes)
+
+    def reachable(self, model_ids):
+        """
+        Returns the models that model_ids refer to, directly or through the
+        properties of other models, by id. Ids that no model has are mapped
+        to None.
+        """
+        found = OrderedDict()
+        pending = list(model_ids)
+        while pending:
+            model_id = pending.pop()
+            if model_id is None or model_id in found:
+                continue
+            model = found[model_id] = self.get(model_id)
+            if model is not None:
+                pending.extend(model.parse().refs)
+        return found
+
+
+operations_index = OperationIndex()
+model_registry = ModelRegistry()
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+import types
+import keyword
+from registry import model_registry
+
+__author__ = 'serena'
+
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+TO_DICT = '''def to_dict(self):
+    return {%s}
+'''
+
+FROM_DICT = '''def from_dict(data):
+    if data is None:
+        return None
+    if not isinstance(data, dict):
+        raise ValueError(%r %% type(data).__name__)
+    self = _new(_cls)
+%s    return self
+'''
+
+
+def _get(name):
+    if IDENTIFIER.match(name) and not keyword.iskeyword(name):
+        return 'self.%s' % name
+    return 'getattr(self, %r)' % name
+
+
+def _set(name, value):
+    if IDENTIFIER.match(name) and not keyword.iskeyword(name):
+        return 'self.%s = %s' % (name, value)
+    return 'setattr(self, %r, %s)' % (name, value)
+
+
+def _check(name, model_id, expected):
+    message = '%s of %s must be %s, not %%s' % (name, model_id, 'a list' if expected == 'list' else 'an object')
+    return ('    if value is not None and not isinstance(value, %s):\n'
+            '        raise ValueError(%r %% type(value).__name__)\n' % (expected, message))
+
+
+def compile_model(model):
+    """
+    Generates the to_dict(instance) and from_dict(data) functions of a model from
+    its properties, and keeps them as model.codec. The properties whose type, or
+    type of items, is another model are converted with the functions of that
+    model, which are generated as well; they are looked up when first called, so
+    the models can refer to each other or to themselves. from_dict raises
+    ValueError when such a property, or data, is not an object or a list as
+    expected.
+    """
+    model.parse()
+    # instances are made without calling __init__, as copy and pickle do
+    namespace = {'_cls': model.cls, '_new': model.cls.__new__ if isinstance(model.cls, type) else types.InstanceType}
+    nested = {}
+    dump = []
+    load = []
+    for index, name in enumerate(sorted(model.properties)):
+        prop = model.properties[name]
+        namespace['_default%d' % index] = prop.get('default')
+        load_value = 'data.get(%r, _default%d)' % (name, index)
+        ref = prop.get('type')
+        items = prop.get('items')
+        if items is not None:
+            ref = items.get('type')
+        if model_registry.get(ref) is None:
+            dump.append('%r: %s' % (name, _get(name)))
+            load.append('    %s\n' % _set(name, load_value))
+            continue
+
+        number = nested.setdefault(ref, len(nested))
+        if items is not None:
+            dump_value = '[_dump%d(item) for item in %s]' % (number, _get(name))
+            load_value = '[_load%d(item) for item in value]' % number
+        else:
+            dump_value, load_value = '_dump%d(%s)' % (number, _get(name)), '_load%d(value)' % number
+        dump.append('%r: None if %s is None else %s' % (name, _get(name), dump_value))
+        load.append('    value = data.get(%r, _default%d)\n' % (name, index))
+        load.append(_check(name, model.id, 'list' if items is not None else 'dict'))
+        load.append('    %s\n' % _set(name, 'None if value is None else %s' % load_value))
+
+    exec(TO_DICT % ', '.join(dump), namespace)
+    exec(FROM_DICT % ('%s must be an object, not %%s' % model.id, ''.join(load)), namespace)
+    model.codec = namespace['to_dict'], namespace['from_dict']
+    for ref, number in nested.items():
+        namespace['_dump%d' % number], namespace['_load%d' % number] = codec(model_registry.get(ref))
+    return model.codec
+
+
+def codec(model):
+    return model.codec or compile_model(model)
+
+
+def install(model):
+    """
+    Gives the class of model to_dict() and from_dict(data), unless it defines
+    them, which are generated the first time either of them is called.
+    """
+    cls = model.cls
+    missing = [name for name in ('to_dict', 'from_dict') if name not in vars(cls)]
+
+    def compiled():
+        to_dict, from_dict = codec(model)
+        if 'to_dict' in missing:
+            cls.to_dict = to_dict
+        if 'from_dict' in missing:
+            cls.from_dict = staticmethod(from_dict)
+        return to_dict, from_dict
+
+    def to_dict(self):
+        return compiled()[0](self)
+
+    def from_dict(data):
+        return compiled()[1](data)
+
+    if 'to_dict' in missing:
+        cls.to_dict = to_dict
+    if 'from_dict' in missing:
+        cls.from_dict = staticmethod(from_dict)
+
+
+def slotted(cls, names):
+    """
+    Returns a copy of cls whose instances keep the attributes of names in
+    __slots__ instead of a __dict__.
+    """
+    if not isinstance(cls, type):
+        raise TypeError('%s must be a new-style class to get __slots__' % cls.__name__)
+    namespace = dict(vars(cls))
+    namespace.pop('__dict__', None)
+    namespace.pop('__weakref__', None)
+    namespace['__slots__'] = tuple(sorted(names))
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
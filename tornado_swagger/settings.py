@@ -9,6 +9,9 @@ SWAGGER_VERSION = '1.2'
 URL_SWAGGER_API_DOCS = 'swagger-api-docs'
 URL_SWAGGER_API_LIST = 'swagger-api-list'
 URL_SWAGGER_API_SPEC = 'swagger-api-spec'
+URL_SWAGGER_API_RESOURCE = 'swagger-api-resource'
+URL_SWAGGER_API_CHANGES = 'swagger-api-changes'
+URL_SWAGGER_API_METRICS = 'swagger-api-metrics'
 
 STATIC_PATH = os.path.join(os.path.dirname(os.path.normpath(__file__)), 'static')
 
@@ -20,6 +23,17 @@ default_settings = {
     'api_key': '',
     'enabled_methods': ['get', 'post', 'put', 'patch', 'delete'],
     'exclude_namespaces': [],
+    'precompress_static': True,
+    'bundle_static': True,
+    'parse_cache': None,
+    'lazy_parse': False,
+    'docstring_parser': 'fast',
+    'spec_path': None,
+    'stream_spec': False,
+    'json_encoder': 'json',
+    'wrap_operations': True,
+    'metrics': False,
+    'validate_requests': False,
 }
 
-models = []
+unparsed = []
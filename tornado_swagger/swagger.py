@@ -1,64 +1,152 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
+import gc
 import inspect
+import urlparse
+import threading
 from functools import wraps
-import epydoc.markup
-from HTMLParser import HTMLParser
+from collections import OrderedDict
 import tornado.web
-from settings import default_settings, models
+from settings import default_settings, unparsed
+from epytext import parse_fields, parse_fields_epydoc
 from handlers import swagger_handlers
+from views import SwaggerApiHandler, SwaggerResourcesHandler, application_resources, find_resources, \
+    HANDLERS_TAG, resource_tag, model_tag
+from cache import spec_cache
+from registry import operations_index, model_registry
+from metrics import metrics
+from validation import compile_operation
+from serializers import install, slotted
+from parse_cache import parse_cache
 
 __author__ = 'serena'
 
+# parsing runs on the IOLoop and on the threads building the specs
+_parse_lock = threading.RLock()
+
+
+def _unwrap(func):
+    """
+    Returns the function behind decorators such as gen.coroutine: the one kept
+    as __wrapped__, or else the function of the same name in the closure.
+    """
+    while True:
+        wrapped = getattr(func, '__wrapped__', None)
+        if wrapped is None:
+            for cell in getattr(func, '__closure__', None) or ():
+                try:
+                    contents = cell.cell_contents
+                except ValueError:
+                    continue
+                if inspect.isfunction(contents) and contents.__name__ == func.__name__:
+                    wrapped = contents
+                    break
+            else:
+                return func
+        func = wrapped
+
+
+def _getargspec(func):
+    return inspect.getargspec(_unwrap(func))
 
-class EpytextParser(HTMLParser):
-    a_text = False
 
-    def __init__(self, tag):
-        HTMLParser.__init__(self)
-        self.tag = tag
-        self.data = None
+def _raw_doc(obj):
+    # the docstring before inspect.getdoc() cleans it, enough to key the parse cache
+    return obj.__doc__ if obj.__doc__ is not None else inspect.getdoc(obj)
 
-    def handle_starttag(self, tag, attr):
-        if tag == self.tag:
-            self.a_text = True
 
-    def handle_endtag(self, tag):
-        if tag == self.tag:
-            self.a_text = False
+def _intern(value):
+    return intern(value) if type(value) is str else value
 
-    def handle_data(self, data):
-        if self.a_text:
-            self.data = data
 
-    def get_data(self):
-        return self.data
+def _frozen(mapping):
+    """
+    Returns a copy of a parsed dict with its strings interned.
+    """
+    return dict((_intern(key), _frozen(value) if isinstance(value, dict) else _intern(value))
+                for key, value in mapping.items())
 
 
 class DocParser(object):
+    """
+    Collects the fields of a docstring. Once parsed, the result is frozen into
+    compact structures: tuples, interned strings, and no parse-time leftovers.
+    """
+    __slots__ = ('notes', 'summary', 'responseClass', 'responseMessages', 'params', 'properties',
+                 'parsed', 'fragment', 'refs', 'validator', 'cache_key')
+
+    # the frozen fields kept by the 'parse_cache' setting, see parse_cache.py
+    CACHED = ('notes', 'summary', 'responseClass', 'responseMessages', 'refs')
+
     def __init__(self):
         self.notes = None
         self.summary = None
         self.responseClass = None
-        self.responseMessages = []
-        self.params = {}
-        self.properties = {}
+        self.responseMessages = None
+        self.params = None
+        self.properties = None
+        self.parsed = False
+        self.fragment = None
+        # ids of the models this refers to, set once parsed
+        self.refs = ()
+        # compiled on first use with 'validate_requests', see validation.py
+        self.validator = None
+        self.cache_key = None
+
+    def parse(self):
+        """
+        Parses the docstring once; parsed is only set when it succeeded, so a
+        failure is raised again by the next call instead of leaving it half
+        built.
+        """
+        if self.parsed:
+            return self
+        with _parse_lock:
+            if self.parsed:
+                return self
+            cached = parse_cache.get(self.cache_key)
+            if cached is not None:
+                self._restore(cached)
+            else:
+                self.responseMessages = []
+                self.params = {}
+                self.properties = {}
+                self._parse()
+                self._freeze()
+                parse_cache.put(self.cache_key, tuple(getattr(self, name) for name in self.CACHED))
+            self.parsed = True
+        return self
+
+    def _cache_key(self, kind, doc, func):
+        self.cache_key = parse_cache.key(default_settings.get('parse_cache'), kind, doc, func,
+                                         default_settings.get('docstring_parser'))
+
+    def _parse(self):
+        pass
+
+    def _restore(self, cached):
+        for name, value in zip(self.CACHED, cached):
+            setattr(self, name, value)
+
+    def _freeze(self):
+        self.responseClass = _intern(self.responseClass)
+        self.responseMessages = tuple(_frozen(message) for message in self.responseMessages)
+        self.properties = _frozen(self.properties)
+        self.refs = tuple(OrderedDict.fromkeys(_intern(ref) for ref in self.refs if ref))
 
     def parse_docstring(self, text):
         if text is None:
             return
 
-        errors = []
-        doc = epydoc.markup.parse(text, markup='epytext', errors=errors)
-        _, fields = doc.split_fields(errors)
+        if default_settings.get('docstring_parser') == 'epydoc':
+            fields = parse_fields_epydoc(text)
+        else:
+            fields = parse_fields(text)
 
         for field in fields:
-            tag = field.tag()
-            arg = field.arg()
-            body = field.body()
-            self._get_parser(tag)(arg=arg, body=body)
-        return doc
+            self._get_parser(field.tag)(arg=field.arg, body=field)
+        return fields
 
     def _get_parser(self, tag):
         parser = {
@@ -66,6 +154,7 @@ class DocParser(object):
             'type': self._parse_type,
             'in': self._parse_in,
             'required': self._parse_required,
+            'enum': self._parse_enum,
             'rtype': self._parse_rtype,
             'property': self._parse_property,
             'ptype': self._parse_ptype,
@@ -111,6 +200,14 @@ class DocParser(object):
             'required': False if body in ['False', 'false'] else True
         })
 
+    def _parse_enum(self, **kwargs):
+        arg = kwargs.get('arg', None)
+        body = self._get_body(**kwargs)
+        self.params.setdefault(arg, {}).update({
+            'name': arg,
+            'enum': tuple(value.strip() for value in body.split(',') if value.strip())
+        })
+
     def _parse_rtype(self, **kwargs):
         body = self._get_body(**kwargs)
         self.responseClass = body
@@ -161,28 +258,35 @@ class DocParser(object):
     @staticmethod
     def _get_body(**kwargs):
         body = kwargs.get('body', None)
-        return body.to_plaintext(None).strip() if body else body
+        return body.body.strip() if body else body
 
     @staticmethod
     def _parse_epytext_para(tag, **kwargs):
-        def _parse_epytext(tag, body):
-            epytextParser = EpytextParser(tag)
-            epytextParser.feed(str(body))
-            data = epytextParser.get_data()
-            epytextParser.close()
-            return data
-
         body = kwargs.get('body', None)
-        return _parse_epytext(tag, body) if body else body
+        return body.inline(tag) if body else body
 
 
 class model(DocParser):
+    """
+    With serializers=True, the class gets to_dict() and from_dict(data), generated
+    from its properties, see serializers.py; with slots=True, the class is
+    replaced by a copy keeping its properties in __slots__, which requires
+    parsing it right away.
+    """
+    __slots__ = ('args', 'kwargs', 'required', 'cls', 'id', 'serializers', 'slots', 'codec')
+
+    CACHED = DocParser.CACHED + ('properties', 'required')
+
     def __init__(self, *args, **kwargs):
         super(model, self).__init__()
-        self.args = args
-        self.kwargs = kwargs
+        self.serializers = kwargs.pop('serializers', False)
+        self.slots = kwargs.pop('slots', False)
+        self.codec = None
+        self.args = args or None
+        self.kwargs = kwargs or None
         self.required = []
         self.cls = None
+        self.id = None
 
     def __call__(self, *args, **kwargs):
         if self.cls:
@@ -191,18 +295,43 @@ class model(DocParser):
         cls = args[0]
         self._parse_model(cls)
 
-        return cls
+        return self.cls
 
     def _parse_model(self, cls):
         self.id = cls.__name__
         self.cls = cls
-        if '__init__' in dir(cls):
-            self._parse_args(cls.__init__)
-        self.parse_docstring(inspect.getdoc(cls))
-        models.append(self)
+        self._cache_key('model', _raw_doc(cls), cls.__init__ if '__init__' in dir(cls) else None)
+        if self.slots:
+            self.cls = slotted(cls, self.parse().properties)
+        if self.serializers:
+            install(self)
+        if not model_registry.add(self):
+            return
+        if default_settings.get('lazy_parse') or default_settings.get('spec_path'):
+            unparsed.append(self)
+        else:
+            self.parse()
+        spec_cache.invalidate([model_tag(self.id)])
+
+    def _parse(self):
+        self.required = []
+        if '__init__' in dir(self.cls):
+            self._parse_args(self.cls.__init__)
+        self.parse_docstring(inspect.getdoc(self.cls))
+        self.refs = [ref for prop in self.properties.values()
+                     for ref in (prop.get('type'), prop.get('items', {}).get('type'))]
+
+    def _freeze(self):
+        super(model, self)._freeze()
+        self.required = tuple(_intern(arg) for arg in self.required)
+        self.params = self.args = self.kwargs = None
+
+    def _restore(self, cached):
+        super(model, self)._restore(cached)
+        self.args = self.kwargs = None
 
     def _parse_args(self, func):
-        argspec = inspect.getargspec(func)
+        argspec = _getargspec(func)
         argspec.args.remove("self")
         defaults = {}
         if argspec.defaults:
@@ -216,12 +345,16 @@ class model(DocParser):
 
 
 class operation(DocParser):
+    __slots__ = ('nickname', 'func', 'func_args', 'kwds', '__name__')
+
+    CACHED = DocParser.CACHED + ('params', 'func_args')
+
     def __init__(self, nickname=None, **kwds):
         super(operation, self).__init__()
         self.nickname = nickname
         self.func = None
         self.func_args = []
-        self.kwds = kwds
+        self.kwds = kwds or None
 
     def __call__(self, *args, **kwds):
         if self.func:
@@ -230,22 +363,61 @@ class operation(DocParser):
         func = args[0]
         self._parse_operation(func)
 
+        if default_settings.get('validate_requests'):
+            @wraps(func)
+            def __validator__(handler, *in_args, **in_kwds):
+                validated = (self.validator or compile_operation(self))(handler, in_args, in_kwds)
+                if validated is not None:
+                    return self.func(handler, *validated[0], **validated[1])
+
+            __validator__.rest_api = self
+            __validator__.__wrapped__ = func
+            return __validator__
+
+        if not default_settings.get('wrap_operations'):
+            func.rest_api = self
+            return func
+
         @wraps(func)
         def __wrapper__(*in_args, **in_kwds):
             return self.func(*in_args, **in_kwds)
 
         __wrapper__.rest_api = self
+        __wrapper__.__wrapped__ = func
         return __wrapper__
 
     def _parse_operation(self, func):
         self.func = func
 
         self.__name__ = func.__name__
-        self._parse_args(func)
+        self._cache_key('operation', _raw_doc(func), _unwrap(func))
+        if default_settings.get('lazy_parse') or default_settings.get('spec_path'):
+            unparsed.append(self)
+        else:
+            self.parse()
+        # the specs change when its handler class is added to an application
+        operations_index.clear()
+
+    def _parse(self):
+        self._parse_args(self.func)
         self.parse_docstring(inspect.getdoc(self.func))
+        self.refs = [self.responseClass] + [param.get('dataType') for param in self.params.values()]
+
+    def _freeze(self):
+        super(operation, self)._freeze()
+        # in the order of the parameters, as listed by the spec
+        self.params = tuple(_frozen(param) for param in self.params.values())
+        self.nickname = _intern(self.nickname)
+        self.func_args = tuple(_intern(arg) for arg in self.func_args)
+        self.properties = self.kwds = None
+
+    def _restore(self, cached):
+        super(operation, self)._restore(cached)
+        self.nickname = _intern(self.nickname)
+        self.kwds = None
 
     def _parse_args(self, func):
-        argspec = inspect.getargspec(func)
+        argspec = _getargspec(func)
         argspec.args.remove("self")
 
         defaults = []
@@ -270,6 +442,85 @@ def docs(**opts):
     default_settings.update(opts)
 
 
+# the third threshold that puts off the full collections for ever, see freeze_gc
+FULL_COLLECTION_THRESHOLD = 2 ** 30
+
+
+def freeze_gc():
+    """
+    Keeps the garbage collector away from the objects alive now, so that forked
+    workers do not copy their pages by collecting them. On Python 3.7+ they are
+    moved where it never looks (gc.freeze). Before that, only full collections
+    go through the oldest generation, where a gc.collect() leaves them, and
+    these are put off for ever by raising the third threshold. The cost: the
+    reference cycles that outlive two younger collections are only freed by an
+    explicit gc.collect(), which also goes through all the objects again.
+    """
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    else:
+        threshold0, threshold1, _ = gc.get_threshold()
+        gc.set_threshold(threshold0, threshold1, FULL_COLLECTION_THRESHOLD)
+
+
+def warm_up(application=None, base_urls=(), freeze=False):
+    """
+    Parses every docstring whose parsing was deferred by the 'lazy_parse' setting.
+    Given an application, also builds the specs of the host of each of base_urls,
+    e.g. 'http://api.example.com', or of its default_host, and serializes them
+    for each of base_urls.
+
+    Called before tornado.process.fork_processes(), the workers share all of it
+    copy-on-write instead of building their own. With freeze, the garbage
+    collector is also kept away from what survives, see freeze_gc(), so that
+    collections in the workers do not write to its pages; on Python 2 that
+    puts off the automatic full collections of the process for good, so it is
+    only for the parent of forked workers.
+    """
+    while unparsed:
+        unparsed.pop().parse()
+    parse_cache.save()
+
+    if application is not None:
+        api_version = default_settings['api_version']
+        exclude_namespaces = default_settings['exclude_namespaces']
+        hosts = [urlparse.urlparse(base_url).netloc for base_url in base_urls]
+        for host in set(hosts) or [application.default_host]:
+            SwaggerResourcesHandler.resources_document(application, api_version, exclude_namespaces, host)
+            for resource in [None] + list(application_resources(application, exclude_namespaces, host)):
+                SwaggerApiHandler.spec_document(application, api_version, exclude_namespaces, resource, host)
+        for base_url, host in zip(base_urls, hosts):
+            base_path = urlparse.urljoin(base_url, default_settings['base_url'])[:-1]
+            SwaggerResourcesHandler.cached_resources(application, api_version, exclude_namespaces,
+                                                     base_url.rstrip('/'), host)
+            for resource in [None] + list(application_resources(application, exclude_namespaces, host)):
+                SwaggerApiHandler.cached_spec(application, api_version, exclude_namespaces, base_path, resource, host)
+
+    if freeze:
+        freeze_gc()
+
+
 class Application(tornado.web.Application):
     def __init__(self, handlers=None, default_host="", transforms=None, **settings):
         super(Application, self).__init__(swagger_handlers() + handlers, default_host, transforms, **settings)
+
+    def log_request(self, handler):
+        super(Application, self).log_request(handler)
+        if default_settings.get('metrics'):
+            metrics.observe(handler)
+
+    def add_handlers(self, host_pattern, host_handlers):
+        """
+        Drops the cached specs of the resources the new handlers belong to,
+        and the ones that list all the resources.
+        """
+        host_handlers = [spec if isinstance(spec, tornado.web.URLSpec) else tornado.web.URLSpec(*spec)
+                         for spec in host_handlers]
+        super(Application, self).add_handlers(host_pattern, host_handlers)
+        if spec_cache.documents:
+            spec_cache.invalidate([HANDLERS_TAG] + [resource_tag(name)
+                                                    for name in find_resources([(None, host_handlers)], ())])
+        else:
+            # nothing was built yet, e.g. in the constructor: no need to find the apis
+            spec_cache.invalidate()
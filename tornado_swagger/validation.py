@@ -0,0 +1,262 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import json
+from tornado.escape import to_unicode
+from registry import model_registry
+
+__author__ = 'serena'
+
+INTEGER_TYPES = frozenset(['integer', 'int', 'long', 'int32', 'int64'])
+NUMBER_TYPES = frozenset(['number', 'float', 'double'])
+BOOLEAN_TYPES = frozenset(['boolean', 'bool'])
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+
+
+class Invalid(ValueError):
+    """
+    Raised by the coercions; errors is a list of (path, message) pairs, path
+    being None for the value itself or the path of a property of a body,
+    such as '.items[0].name'.
+    """
+    def __init__(self, message, errors=None):
+        super(Invalid, self).__init__(message)
+        self.errors = errors or [(None, message)]
+
+
+def _text(value):
+    try:
+        return to_unicode(value)
+    except UnicodeDecodeError:
+        raise Invalid('must be utf-8')
+
+
+def _to_integer(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise Invalid('must be an integer')
+
+
+def _to_number(value):
+    try:
+        return float(value)
+    except ValueError:
+        raise Invalid('must be a number')
+
+
+def _to_boolean(value):
+    try:
+        return BOOLEANS[value.lower()]
+    except KeyError:
+        raise Invalid('must be true or false')
+
+
+def coercion(data_type):
+    """
+    Returns the function converting the text of a parameter of data_type.
+    """
+    if data_type in INTEGER_TYPES:
+        return lambda value: _to_integer(_text(value))
+    if data_type in NUMBER_TYPES:
+        return lambda value: _to_number(_text(value))
+    if data_type in BOOLEAN_TYPES:
+        return lambda value: _to_boolean(_text(value))
+    return _text
+
+
+def _enum_coercion(coerce, values):
+    """
+    Returns coerce, only accepting the values of an @enum, converted the same
+    way.
+    """
+    allowed = frozenset(coerce(value) for value in values)
+    message = 'must be one of %s' % ', '.join(values)
+
+    def check(value):
+        value = coerce(value)
+        if value not in allowed:
+            raise Invalid(message)
+        return value
+    return check
+
+
+def _json_check(data_type):
+    """
+    Returns the function checking one decoded json value of data_type, which
+    returns a list of (path, message) errors, the path being relative to the
+    value; or None when there is nothing to check.
+    """
+    if data_type in INTEGER_TYPES:
+        return lambda value: [] if type(value) in (int, long) else [('', 'must be an integer')]
+    if data_type in NUMBER_TYPES:
+        return lambda value: [] if type(value) in (int, long, float) else [('', 'must be a number')]
+    if data_type in BOOLEAN_TYPES:
+        return lambda value: [] if type(value) is bool else [('', 'must be true or false')]
+    if data_type == 'array':
+        return lambda value: [] if type(value) is list else [('', 'must be an array')]
+    # untyped properties are documented as strings, so strings are not enforced
+    return None
+
+
+def _model_check(model_id):
+    """
+    Returns the function checking a decoded json value against the model of
+    model_id, or None when model_id names no model. The model is looked up
+    on each call so that nested and recursive models are found once defined.
+    """
+    if model_registry.get(model_id) is None:
+        return None
+
+    def check(value):
+        model = model_registry.get(model_id)
+        if model is None:
+            return []
+        return (model.validator or compile_model(model))(value)
+    return check
+
+
+def _value_check(data_type):
+    return _model_check(data_type) or _json_check(data_type)
+
+
+def compile_model(model):
+    """
+    Compiles the checks of the required properties and the types of the
+    properties of a model, and keeps them as model.validator.
+    """
+    model.parse()
+    required = model.required
+    checks = []
+    for name, prop in model.properties.items():
+        check = _value_check(prop.get('type'))
+        items = prop.get('items')
+        item_check = _value_check(items.get('type')) if items else None
+        if check or item_check:
+            checks.append((name, check, item_check))
+
+    def validate(value):
+        if type(value) is not dict:
+            return [('', 'must be an object')]
+        errors = []
+        for name in required:
+            if value.get(name) is None:
+                errors.append(('.' + name, 'is required'))
+        for name, check, item_check in checks:
+            prop = value.get(name)
+            if prop is None:
+                continue
+            found = check(prop) if check else None
+            if found:
+                errors.extend(('.%s%s' % (name, path), message) for path, message in found)
+            if item_check and type(prop) is list:
+                for index, item in enumerate(prop):
+                    found = item_check(item)
+                    if found:
+                        errors.extend(('.%s[%d]%s' % (name, index, path), message) for path, message in found)
+        return errors
+
+    model.validator = validate
+    return validate
+
+
+def _body_coercion(data_type):
+    check = _value_check(data_type)
+
+    def coerce(body):
+        try:
+            value = json.loads(body)
+        except ValueError:
+            raise Invalid('must be valid json')
+        errors = check(value) if check else None
+        if errors:
+            raise Invalid('is invalid', errors)
+        return value
+    return coerce
+
+
+def _extraction(param, func_args):
+    """
+    Returns the function getting the raw value of param from (request, args, kwds),
+    or None when it cannot be found in a request.
+    """
+    name = param['name']
+    param_type = param.get('paramType')
+    if param_type == 'path':
+        if name not in func_args:
+            return None
+        position = func_args.index(name)
+        return lambda request, args, kwds: args[position] if position < len(args) else kwds.get(name)
+    if param_type == 'query':
+        return lambda request, args, kwds: (request.query_arguments.get(name) or (None,))[-1]
+    if param_type == 'form':
+        return lambda request, args, kwds: (request.body_arguments.get(name) or (None,))[-1]
+    if param_type == 'header':
+        return lambda request, args, kwds: request.headers.get(name)
+    if param_type == 'body':
+        return lambda request, args, kwds: request.body or None
+    return None
+
+
+def reject(handler, errors):
+    handler.clear()
+    handler.set_status(400)
+    handler.set_header('Content-Type', 'application/json')
+    handler.finish(json.dumps({'code': 400, 'message': 'Invalid request', 'errors': errors}))
+
+
+def compile_operation(api):
+    """
+    Compiles the extraction, coercion and checks of the parameters of an
+    operation into validate(handler, args, kwds). It keeps the coerced values
+    by name as handler.validated and returns args and kwds with the path
+    parameters coerced; or else answers 400 with the list of errors, each
+    naming the parameter, where it was looked for and what is wrong, and
+    returns None.
+    """
+    api.parse()
+    steps = []
+    for param in api.params:
+        extract = _extraction(param, api.func_args)
+        if extract is None:
+            continue
+        name = param['name']
+        if param.get('paramType') == 'body':
+            coerce = _body_coercion(param.get('dataType'))
+        else:
+            coerce = coercion(param.get('dataType'))
+            if param.get('enum'):
+                coerce = _enum_coercion(coerce, param['enum'])
+        steps.append((name, param['paramType'], extract, coerce, param.get('required', False)))
+    path_args = [(position, name) for position, name in enumerate(api.func_args)
+                 if any(step[0] == name and step[1] == 'path' for step in steps)]
+
+    def validate(handler, args, kwds):
+        request = handler.request
+        values = {}
+        errors = []
+        for name, location, extract, coerce, required in steps:
+            value = extract(request, args, kwds)
+            if value is None:
+                if required:
+                    errors.append({'name': name, 'in': location, 'message': 'is required'})
+                continue
+            try:
+                values[name] = coerce(value)
+            except Invalid as e:
+                errors.extend({'name': name + (path or ''), 'in': location, 'message': message}
+                              for path, message in e.errors)
+        if errors:
+            reject(handler, errors)
+            return None
+        handler.validated = values
+        if path_args:
+            args = list(args)
+            for position, name in path_args:
+                if position < len(args):
+                    args[position] = values.get(name, args[position])
+                elif name in kwds:
+                    kwds[name] = values[name]
+        return args, kwds
+
+    api.validator = validate
+    return validate
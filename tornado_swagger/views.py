@@ -1,116 +1,717 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import os.path
+import mimetypes
 import urlparse
 import json
-import inspect
+import hashlib
+import calendar
+import datetime
+import email.utils
+from collections import OrderedDict
 import tornado.web
 import tornado.template
-from settings import SWAGGER_VERSION, URL_SWAGGER_API_LIST, URL_SWAGGER_API_SPEC, models
+from tornado import gen
+from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
+from tornado.escape import utf8
+from tornado.httputil import split_host_and_port
+from settings import SWAGGER_VERSION, URL_SWAGGER_API_LIST, URL_SWAGGER_API_RESOURCE, URL_SWAGGER_API_METRICS, \
+    default_settings
+from cache import SpecBody, spec_cache, make_etag
+from registry import operations_index, model_registry
+from metrics import metrics
+from compress import EXTENSIONS, accepted_encodings, negotiate
+from formats import MEDIA_TYPES, CONTENT_TYPES, encode, negotiate_format
+from bundle import ui_assets, versioned_url
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
 
 __author__ = 'serena'
 
+# specs are built on a single thread, off the IOLoop, one at a time
+executor = ThreadPoolExecutor(1) if ThreadPoolExecutor else None
+building = {}
+running = {}
+
+# responses are written and flushed in chunks of about this size
+CHUNK_SIZE = 64 * 1024
+
+
+# stands for the basePath, the only part of a spec that depends on the request
+BASE_PATH = object()
+
+# what the cached specs are tagged with, see SpecCache.invalidate
+HANDLERS_TAG = ('handlers', None)
+
+
+def resource_tag(name):
+    return 'resource', name
+
+
+def model_tag(model_id):
+    return 'model', model_id
+
 
 def json_dumps(obj, pretty=False):
-    return json.dumps(obj, sort_keys=True, indent=4, separators=(',', ': ')) if pretty else json.dumps(obj)
+    if pretty:
+        return json.dumps(obj, sort_keys=True, indent=4, separators=(',', ': '))
+    if ujson is not None and default_settings.get('json_encoder') == 'ujson':
+        return ujson.dumps(obj, escape_forward_slashes=False)
+    return json.dumps(obj)
+
+
+class Fragment(dict):
+    """
+    A part of the specs that does not change once built, such as an operation
+    or a model. It keeps its json, so every spec it appears in reuses it.
+    """
+    def __init__(self, *args, **kwds):
+        super(Fragment, self).__init__(*args, **kwds)
+        self.serialized = {}
+
+    def json(self, pretty=False, keep=True):
+        data = self.serialized.get(pretty)
+        if data is None:
+            data = json_dumps(self, pretty)
+            if keep:
+                self.serialized[pretty] = data
+        return data
+
+
+def _indent(data, level):
+    return data.replace('\n', '\n' + '    ' * level) if level else data
+
+
+def iter_json(value, pretty=False, level=0, keep=True):
+    """
+    Yields the json of value piece by piece, taking the json of the fragments
+    it contains as is, so that the whole document is never encoded at once.
+    The json of the fragments is kept on them unless keep is False.
+    BASE_PATH is yielded unchanged.
+    """
+    if value is BASE_PATH:
+        yield value
+    elif isinstance(value, Fragment):
+        yield _indent(value.json(pretty, keep), level) if pretty else value.json(False, keep)
+    elif isinstance(value, (dict, list)) and value:
+        is_dict = isinstance(value, dict)
+        newline = '\n' + '    ' * (level + 1) if pretty else ''
+        separator = ',' if pretty else ', '
+        yield '{' if is_dict else '['
+        if is_dict:
+            for i, key in enumerate(sorted(value) if pretty else list(value)):
+                yield '%s%s%s: ' % (separator if i else '', newline, json.dumps(key))
+                for chunk in iter_json(value[key], pretty, level + 1, keep):
+                    yield chunk
+        else:
+            for i, item in enumerate(value):
+                yield (separator if i else '') + newline
+                for chunk in iter_json(item, pretty, level + 1, keep):
+                    yield chunk
+        if pretty:
+            yield '\n' + '    ' * level
+        yield '}' if is_dict else ']'
+    else:
+        yield _indent(json_dumps(value, pretty), level)
+
+
+def json_parts(document, pretty=False):
+    """
+    Returns the json of document before and after its basePath,
+    and the sha1 of both.
+    """
+    chunks = list(iter_json(dict(document, basePath=BASE_PATH), pretty))
+    index = chunks.index(BASE_PATH)
+    head, tail = utf8(''.join(chunks[:index])), utf8(''.join(chunks[index + 1:]))
+    return head, tail, hashlib.sha1(head + b'\0' + tail).hexdigest()
+
+
+def document_digest(document_key, document):
+    """
+    Returns the sha1 of the compact json of document around its basePath,
+    hashed as it is encoded so that the json is not kept. It is computed once
+    per document, and kept along with it.
+    """
+    cached = spec_cache.get_document((document_key, 'digest'))
+    if cached is not None and cached[0] is document:
+        return cached[1]
+    digest = hashlib.sha1()
+    for chunk in iter_json(dict(document, basePath=BASE_PATH), keep=False):
+        digest.update(b'\0' if chunk is BASE_PATH else utf8(chunk))
+    return spec_cache.set_document((document_key, 'digest'), (document, digest.hexdigest()), [document_key])[1]
+
+
+def build_once(key, build, *args):
+    """
+    Returns a future for build(*args), which fills spec_cache's entry or
+    document for key. When it is missing the build runs on the executor, and
+    concurrent callers for the same key share that single build, unless the
+    cache was invalidated after it started: its result is outdated, and is
+    not stored.
+    """
+    generation = spec_cache.generation
+    started, future = building.get(key, (None, None))
+    if started != generation:
+        if executor is None or spec_cache.get(key) is not None or spec_cache.get_document(key) is not None:
+            return gen.maybe_future(build(*args))
+        future = executor.submit(spec_cache.build, generation, build, *args)
+        building[key] = generation, future
+
+        def done(f):
+            if building.get(key, (None, None))[1] is f:
+                del building[key]
+        IOLoop.current().add_future(future, done)
+    return future
+
+
+def run_once(key, func, *args):
+    """
+    Returns a future for func(*args), run on the executor, off the IOLoop;
+    concurrent callers for the same key share it. Runs inline without the
+    executor.
+    """
+    future = running.get(key)
+    if future is None:
+        if executor is None:
+            return gen.maybe_future(func(*args))
+        future = running[key] = executor.submit(func, *args)
+        IOLoop.current().add_future(future, lambda f: running.pop(key, None))
+    return future
+
+
+def cache_entry(key, document_key, document, base_path):
+    """
+    Caches the json of document for base_path, joined around the json of the
+    rest of the document, which is made and hashed once for all the base paths.
+    Both are dropped along with the document. The binary formats are encoded
+    whole, when first asked for. Only the most recently used base paths of a
+    document are kept, see SpecCache.max_group_entries.
+    """
+    # the parts are not kept if the document is outdated by then
+    generation = spec_cache.built_at()
+    if generation is None:
+        generation = spec_cache.generation
+
+    def serialize(pretty):
+        if pretty in CONTENT_TYPES:
+            return SpecBody(encode(dict(document, basePath=base_path), pretty))
+        parts = None
+        if spec_cache.get_document(document_key) is document:
+            parts = spec_cache.get_document((document_key, pretty))
+        if parts is None:
+            parts = spec_cache.build(generation, spec_cache.set_document, (document_key, pretty),
+                                     json_parts(document, pretty), [document_key])
+        head, tail, digest = parts
+        value = utf8(json_dumps(base_path, pretty))
+        return SpecBody(b''.join((head, value, tail)), hashlib.sha1(digest + value).hexdigest())
+    return spec_cache.set(key, serialize, [document_key], document_key)
+
+
+def resource_name(path):
+    return path.strip('/').split('/')[0] or 'default'
+
+
+def find_resources(host_handlers, exclude_namespaces):
+    """
+    Groups the documented apis by the first segment of their path,
+    dropping the excluded namespaces.
+    """
+    resources = OrderedDict()
+    for api in SwaggerApiHandler.find_api(host_handlers):
+        name = resource_name(api[0])
+        if name not in exclude_namespaces:
+            resources.setdefault(name, []).append(api)
+    return resources
+
+
+def host_handlers(application, host=None):
+    """
+    Returns the (host pattern, handlers) groups of application that Tornado
+    routes host to, falling back on its default_host, or all of them when
+    host is None.
+    """
+    if host is None:
+        return application.handlers
+    host = split_host_and_port(host.lower())[0]
+    groups = [group for group in application.handlers if group[0].match(host)]
+    return groups or [group for group in application.handlers if group[0].match(application.default_host)]
+
+
+def host_scope(application, host=None):
+    """
+    Returns the key the specs of host are cached under: the patterns of its
+    handler groups, so that all the hosts served by the same handlers share
+    their specs. None stands for all the handlers.
+    Handlers added later under the same pattern keep the key, their resources
+    are invalidated instead.
+    """
+    if host is None:
+        return None
+    return tuple(OrderedDict.fromkeys(pattern.pattern for pattern, handlers in host_handlers(application, host)))
+
+
+def application_resources(application, exclude_namespaces, host=None):
+    key = ('resources-index', id(application), host_scope(application, host))
+    resources = spec_cache.get_document(key)
+    if resources is None:
+        resources = spec_cache.set_document(key, find_resources(host_handlers(application, host),
+                                                                exclude_namespaces), [HANDLERS_TAG])
+    return resources
+
+
+def referenced_models(apis):
+    """
+    Returns the models that the operations of apis can reach, by id.
+    The ids that no model has yet are mapped to None.
+    """
+    return model_registry.reachable(model_id for path, spec, operations in apis
+                                    for api in operations for model_id in api.refs)
+
+
+class ConditionalHandler(tornado.web.RequestHandler):
+    """
+    Sets strong validators (ETag and Last-Modified) and answers conditional
+    requests with 304, so the caller can skip rendering when nothing changed.
+    """
+    def set_validators(self, etag, last_modified):
+        self.set_header('Etag', etag)
+        self.set_header('Last-Modified', datetime.datetime.utcfromtimestamp(int(last_modified)))
+
+    def is_not_modified(self, etag, last_modified):
+        none_match = self.request.headers.get('If-None-Match')
+        if none_match is not None:
+            tags = [tag.strip() for tag in none_match.split(',')]
+            return '*' in tags or etag in tags
+
+        modified_since = self.request.headers.get('If-Modified-Since')
+        if modified_since is not None:
+            date_tuple = email.utils.parsedate(modified_since)
+            return date_tuple is not None and int(last_modified) <= calendar.timegm(date_tuple)
+        return False
+
+    def check_not_modified(self, etag, last_modified):
+        self.set_validators(etag, last_modified)
+        if self.is_not_modified(etag, last_modified):
+            self.set_status(304)
+            self.finish()
+            return True
+        return False
+
+    @gen.coroutine
+    def write_chunks(self, chunks):
+        """
+        Writes chunks and finishes, flushing every CHUNK_SIZE bytes so that
+        only about that much of the response is buffered at a time.
+        """
+        pending = 0
+        try:
+            for chunk in chunks:
+                self.write(chunk)
+                pending += len(chunk)
+                if pending >= CHUNK_SIZE:
+                    pending = 0
+                    yield self.flush()
+        except StreamClosedError:
+            return
+        self.finish()
+
+    def negotiate_format(self):
+        """
+        Returns the format of the spec the client asks for, None being json,
+        and sets the content type.
+        """
+        fmt = negotiate_format(self.request.headers.get('Accept'))
+        if fmt:
+            self.set_header('content-type', CONTENT_TYPES[fmt])
+        return fmt
 
+    @gen.coroutine
+    def finish_entry(self, entry, pretty=False):
+        """
+        Finishes with the variant of entry the client asks for, which is
+        serialized off the IOLoop the first time.
+        """
+        fmt = self.negotiate_format()
+        if not entry.has(pretty, fmt):
+            yield run_once(('serialize', id(entry), fmt or bool(pretty)), entry.body, pretty, fmt)
+        self.set_header('Vary', 'Accept, Accept-Encoding' if MEDIA_TYPES else 'Accept-Encoding')
+        yield self.finish_body(entry.body(pretty, fmt), entry.created)
 
-class SwaggerUIHandler(tornado.web.RequestHandler):
-    def initialize(self, static_path, **kwds):
+    @gen.coroutine
+    def finish_body(self, body, last_modified):
+        """
+        Finishes with body, a SpecBody, compressed as the client accepts it,
+        or with 304 when the client has it already. Each compressed variant
+        is made off the IOLoop the first time.
+        """
+        encoding = negotiate(self.request.headers.get('Accept-Encoding'))
+        if self.check_not_modified(body.etag(encoding), last_modified):
+            return
+        if not body.has(encoding):
+            yield run_once(('compress', id(body), encoding), body.data, encoding)
+        if encoding:
+            self.set_header('Content-Encoding', encoding)
+        data = body.data(encoding)
+        self.set_header('Content-Length', len(data))
+        yield self.write_chunks(data[i:i + CHUNK_SIZE] for i in xrange(0, len(data), CHUNK_SIZE))
+
+
+class SwaggerStaticFileHandler(tornado.web.StaticFileHandler):
+    """
+    Serves the precompressed .br/.gz sibling of a static file when the client
+    accepts it, so assets are never compressed per request.
+    """
+    def validate_absolute_path(self, root, absolute_path):
+        absolute_path = super(SwaggerStaticFileHandler, self).validate_absolute_path(root, absolute_path)
+        self.uncompressed_path = absolute_path
+        self.set_header('Vary', 'Accept-Encoding')
+        for encoding in accepted_encodings(self.request.headers.get('Accept-Encoding')):
+            compressed_path = absolute_path + EXTENSIONS[encoding]
+            if os.path.isfile(compressed_path):
+                self.set_header('Content-Encoding', encoding)
+                return compressed_path
+        return absolute_path
+
+    def get_content_type(self):
+        mime_type, _ = mimetypes.guess_type(self.uncompressed_path)
+        return mime_type or 'application/octet-stream'
+
+    def set_extra_headers(self, path):
+        # a versioned url names the content itself, which never changes
+        if 'v' in self.request.arguments:
+            self.set_header('Cache-Control', 'max-age=%d, public, immutable' % self.CACHE_MAX_AGE)
+
+
+class SwaggerSpecFileHandler(SwaggerStaticFileHandler):
+    """
+    Serves a spec written by tornado_swagger.build; filename is formatted
+    with the arguments captured from the url.
+    """
+    def initialize(self, path, filename):
+        super(SwaggerSpecFileHandler, self).initialize(path)
+        self.filename = filename
+
+    def get(self, *args):
+        return super(SwaggerSpecFileHandler, self).get(self.filename % args)
+
+    def head(self, *args):
+        return super(SwaggerSpecFileHandler, self).get(self.filename % args, include_body=False)
+
+
+class SwaggerUIHandler(ConditionalHandler):
+    """
+    Renders index.html once per discovery url and serves the page from memory,
+    loading the stylesheets and the scripts as the versioned bundles.
+    """
+    # the rendered pages, by discovery url, metrics url and index.html mtime
+    pages = {}
+    MAX_PAGES = 64
+
+    def initialize(self, static_path, bundle_static=False, **kwds):
         self.static_path = static_path
+        self.bundled = bundle_static
 
     def get_template_path(self):
         return self.static_path
 
     def get(self):
         discovery_url = urlparse.urljoin(self.request.full_url(), self.reverse_url(URL_SWAGGER_API_LIST))
-        self.render('index.html', discovery_url=discovery_url)
+        metrics_url = self.reverse_url(URL_SWAGGER_API_METRICS) if default_settings.get('metrics') else ''
+        last_modified = os.path.getmtime(os.path.join(self.static_path, 'index.html'))
+        key = (discovery_url, metrics_url, last_modified, self.bundled)
+        body = self.pages.get(key)
+        if body is None:
+            stylesheets, scripts = ui_assets(self.static_path, self.bundled)
+            data = self.render_string('index.html', discovery_url=discovery_url, metrics_url=metrics_url,
+                                      stylesheets=stylesheets, scripts=scripts,
+                                      versioned_url=versioned_url, static_path=self.static_path)
+            if len(self.pages) >= self.MAX_PAGES:
+                self.pages.clear()
+            body = self.pages[key] = SpecBody(utf8(data))
+        self.set_header('Content-Type', 'text/html; charset=UTF-8')
+        self.set_header('Vary', 'Accept-Encoding')
+        return self.finish_body(body, last_modified)
 
 
-class SwaggerResourcesHandler(tornado.web.RequestHandler):
+class SwaggerResourcesHandler(ConditionalHandler):
     def initialize(self, api_version, exclude_namespaces, **kwds):
         self.api_version = api_version
         self.exclude_namespaces = exclude_namespaces
 
+    @gen.coroutine
     def get(self):
         self.set_header('content-type', 'application/json')
         u = urlparse.urlparse(self.request.full_url())
-        resources = {
-            'apiVersion': self.api_version,
+        base_path = '%s://%s' % (u.scheme, u.netloc)
+        host = self.request.host
+        entry = yield build_once(('resources', id(self.application), base_path, host_scope(self.application, host)),
+                                 self.cached_resources, self.application, self.api_version, self.exclude_namespaces,
+                                 base_path, host)
+        yield self.finish_entry(entry, self.get_arguments('pretty'))
+
+    @classmethod
+    def cached_resources(cls, application, api_version, exclude_namespaces, base_path, host=None):
+        scope = host_scope(application, host)
+        key = ('resources', id(application), base_path, scope)
+        entry = spec_cache.get(key)
+        if entry is None:
+            document = cls.resources_document(application, api_version, exclude_namespaces, host)
+            entry = cache_entry(key, ('resources', id(application), scope), document, base_path)
+        return entry
+
+    @classmethod
+    def resources_document(cls, application, api_version, exclude_namespaces, host=None):
+        key = ('resources', id(application), host_scope(application, host))
+        document = spec_cache.get_document(key)
+        if document is None:
+            document = spec_cache.set_document(key, cls.build_resources(
+                application, api_version, exclude_namespaces, None, host), [HANDLERS_TAG])
+        return document
+
+    @classmethod
+    def build_resources(cls, application, api_version, exclude_namespaces, base_path, host=None):
+        """
+        Returns the resource listing of the apis served to host,
+        or of all the apis when host is None.
+        """
+        return {
+            'apiVersion': api_version,
             'swaggerVersion': SWAGGER_VERSION,
-            'basePath': '%s://%s' % (u.scheme, u.netloc),
+            'basePath': base_path,
             'produces': ["application/json"],
             'description': 'Test Api Spec',
             'apis': [{
-                'path': self.reverse_url(URL_SWAGGER_API_SPEC),
-                'description': 'Test Api Spec'
-            }]
+                'path': application.reverse_url(URL_SWAGGER_API_RESOURCE, name),
+                'description': cls.__get_resource_description(apis)
+            } for name, apis in application_resources(application, exclude_namespaces, host).items()]
         }
 
-        self.finish(json_dumps(resources, self.get_arguments('pretty')))
+    @staticmethod
+    def __get_resource_description(apis):
+        for path, spec, operations in apis:
+            if spec.handler_class.__doc__:
+                return spec.handler_class.__doc__.strip().split('\n')[0]
+        return ''
 
 
-class SwaggerApiHandler(tornado.web.RequestHandler):
-    def initialize(self, api_version, base_url, **kwds):
+class SwaggerChangesHandler(tornado.web.RequestHandler):
+    """
+    Lets clients poll for changes without downloading the specs: returns the
+    generation of the specs and, given ?since=<generation>, the resources and
+    models of this host that changed since then, or null for both when that
+    is too old to tell.
+    """
+    def initialize(self, api_version, exclude_namespaces, **kwds):
         self.api_version = api_version
-        self.base_url = base_url
+        self.exclude_namespaces = exclude_namespaces
+
+    @gen.coroutine
+    def get(self):
+        self.set_header('content-type', 'application/json')
+        self.set_header('Cache-Control', 'no-cache')
+        changes = {'generation': spec_cache.generation}
+        since = self.get_argument('since', None)
+        if since is not None:
+            if not since.isdigit():
+                raise tornado.web.HTTPError(400)
+            tags = spec_cache.changed_since(int(since))
+            if tags is None:
+                changes.update(resources=None, models=None)
+            else:
+                host = self.request.host
+                resources = application_resources(self.application, self.exclude_namespaces, host)
+                models = yield run_once(('referenced-models', id(self.application),
+                                         host_scope(self.application, host)),
+                                        referenced_models, [api for apis in resources.values() for api in apis])
+                changes['resources'] = sorted(name for kind, name in tags if kind == 'resource' and name in resources)
+                changes['models'] = sorted(name for kind, name in tags if kind == 'model' and models.get(name))
+        self.finish(json_dumps(changes))
+
+
+class SwaggerMetricsHandler(tornado.web.RequestHandler):
+    """
+    Returns the latency and the responses of each documented operation, as
+    json, or in the Prometheus text format given ?format=prometheus or when
+    text/plain is accepted rather than json.
+    """
+    def initialize(self, **kwds):
+        pass
 
     def get(self):
+        self.set_header('Cache-Control', 'no-cache')
+        output = self.get_argument('format', None)
+        if output is None:
+            accept = self.request.headers.get('Accept', '')
+            output = 'prometheus' if 'text/plain' in accept and 'json' not in accept else 'json'
+        if output == 'prometheus':
+            self.set_header('content-type', 'text/plain; version=0.0.4')
+            self.finish(metrics.prometheus())
+        elif output == 'json':
+            self.set_header('content-type', 'application/json')
+            self.finish(json_dumps(metrics.snapshot(), self.get_arguments('pretty')))
+        else:
+            raise tornado.web.HTTPError(400)
+
+
+class SwaggerApiHandler(ConditionalHandler):
+    def initialize(self, api_version, base_url, exclude_namespaces, stream_spec=False, **kwds):
+        self.api_version = api_version
+        self.base_url = base_url
+        self.exclude_namespaces = exclude_namespaces
+        self.stream_spec = stream_spec
+
+    @gen.coroutine
+    def get(self, resource=None):
         self.set_header('content-type', 'application/json')
-        apis = self.find_api(self.application.handlers)
-        if apis is None:
+        base_path = urlparse.urljoin(self.request.full_url(), self.base_url)[:-1]
+        host = self.request.host
+        if self.stream_spec:
+            yield self.stream(base_path, resource, host)
+            return
+        entry = yield build_once(('spec', id(self.application), base_path, resource, host_scope(self.application, host)),
+                                 self.cached_spec, self.application, self.api_version, self.exclude_namespaces,
+                                 base_path, resource, host)
+        if entry is None:
             raise tornado.web.HTTPError(404)
+        yield self.finish_entry(entry, self.get_arguments('pretty'))
+
+    @gen.coroutine
+    def stream(self, base_path, resource=None, host=None):
+        """
+        Encodes the spec while writing it, without keeping the serialized
+        document: memory stays bounded by the largest api or model.
+        """
+        document_key = ('spec', id(self.application), resource, host_scope(self.application, host))
+        document = yield build_once(document_key, self.spec_document, self.application, self.api_version,
+                                    self.exclude_namespaces, resource, host)
+        if document is None:
+            raise tornado.web.HTTPError(404)
+        pretty = bool(self.get_arguments('pretty'))
+        fmt = self.negotiate_format()
+        if MEDIA_TYPES:
+            self.set_header('Vary', 'Accept')
+        # from the content, so that it is the same in every process serving it
+        digest = yield run_once(('digest', id(document)), document_digest, document_key, document)
+        etag = 'W/' + make_etag(utf8('%s:%s:%s:%s' % (digest, base_path, pretty, fmt)))
+        if self.check_not_modified(etag, spec_cache.invalidated):
+            return
+        if fmt:
+            data = encode(dict(document, basePath=base_path), fmt)
+            yield self.write_chunks(data[i:i + CHUNK_SIZE] for i in xrange(0, len(data), CHUNK_SIZE))
+        else:
+            yield self.write_chunks(iter_json(dict(document, basePath=base_path), pretty, keep=False))
+
+    @classmethod
+    def cached_spec(cls, application, api_version, exclude_namespaces, base_path, resource=None, host=None):
+        scope = host_scope(application, host)
+        key = ('spec', id(application), base_path, resource, scope)
+        entry = spec_cache.get(key)
+        if entry is None:
+            document = cls.spec_document(application, api_version, exclude_namespaces, resource, host)
+            if document is None:
+                return None
+            entry = cache_entry(key, ('spec', id(application), resource, scope), document, base_path)
+        return entry
+
+    @classmethod
+    def spec_document(cls, application, api_version, exclude_namespaces, resource=None, host=None):
+        key = ('spec', id(application), resource, host_scope(application, host))
+        document = spec_cache.get_document(key)
+        if document is None:
+            document = cls.build_spec(application, api_version, exclude_namespaces, None, resource, host)
+            if document is not None:
+                spec_cache.set_document(key, document, cls.spec_tags(application, exclude_namespaces, resource, host))
+        return document
+
+    @staticmethod
+    def spec_tags(application, exclude_namespaces, resource=None, host=None):
+        """
+        Returns the tags of the spec of resource: the resource and the models
+        it refers to. The spec of all the apis depends on everything.
+        """
+        if resource is None:
+            return None
+        apis = application_resources(application, exclude_namespaces, host)[resource]
+        return [resource_tag(resource)] + [model_tag(model_id) for model_id in referenced_models(apis)]
+
+    @classmethod
+    def build_spec(cls, application, api_version, exclude_namespaces, base_path, resource=None, host=None):
+        """
+        Returns the spec of all the apis served to host, or of a single resource,
+        or None when the resource is unknown. Only the models its operations can
+        reach are included.
+        """
+        resources = application_resources(application, exclude_namespaces, host)
+        if resource is None:
+            apis = [api for apis in resources.values() for api in apis]
+        elif resource in resources:
+            apis = resources[resource]
+        else:
+            return None
 
         specs = {
-            'apiVersion': self.api_version,
+            'apiVersion': api_version,
             'swaggerVersion': SWAGGER_VERSION,
-            'basePath': urlparse.urljoin(self.request.full_url(), self.base_url)[:-1],
-            'apis': [self.__get_api_spec__(path, spec, operations) for path, spec, operations in apis],
-            'models': self.__get_models_spec(models)
+            'basePath': base_path,
+            'apis': [cls.__get_api_spec__(path, spec, operations) for path, spec, operations in apis],
+            'models': cls.__get_models_spec(referenced_models(apis))
         }
-        self.finish(json_dumps(specs, self.get_arguments('pretty')))
+        if resource is not None:
+            specs['resourcePath'] = '/' + resource
+        return specs
 
-    def __get_models_spec(self, models):
-        models_spec = {}
-        for model in models:
-            models_spec.setdefault(model.id, self.__get_model_spec(model))
-        return models_spec
+    @classmethod
+    def __get_models_spec(cls, models):
+        return dict((model_id, cls.__get_model_spec(model)) for model_id, model in models.items() if model)
 
     @staticmethod
     def __get_model_spec(model):
-        return {
-            'description': model.summary,
-            'id': model.id,
-            'notes': model.notes,
-            'properties': model.properties,
-            'required': model.required
-        }
+        if model.fragment is None:
+            model.fragment = Fragment({
+                'description': model.summary,
+                'id': model.id,
+                'notes': model.notes,
+                'properties': model.properties,
+                'required': model.required
+            })
+        return model.fragment
 
     @staticmethod
-    def __get_api_spec__(path, spec, operations):
-        return {
-            'path': path,
-            'description': spec.handler_class.__doc__,
-            'operations': [{
+    def __get_operation_spec(api):
+        if api.fragment is None:
+            api.fragment = Fragment({
                 'httpMethod': api.func.__name__.upper(),
                 'nickname': api.nickname,
-                'parameters': api.params.values(),
+                'parameters': api.params,
                 'summary': api.summary,
                 'notes': api.notes,
                 'responseClass': api.responseClass,
                 'responseMessages': api.responseMessages,
-            } for api in operations]
+            })
+        return api.fragment
+
+    @classmethod
+    def __get_api_spec__(cls, path, spec, operations):
+        return {
+            'path': path,
+            'description': spec.handler_class.__doc__,
+            'operations': [cls.__get_operation_spec(api) for api in operations]
         }
 
     @staticmethod
     def find_api(host_handlers):
         for host, handlers in host_handlers:
             for spec in handlers:
-                for (name, member) in inspect.getmembers(spec.handler_class):
-                    if inspect.ismethod(member) and hasattr(member, 'rest_api'):
-                        spec_path = spec._path % tuple(['{%s}' % arg for arg in member.rest_api.func_args])
-                        operations = [member.rest_api for (name, member) in inspect.getmembers(spec.handler_class)
-                                      if hasattr(member, 'rest_api')]
-                        yield spec_path, spec, operations
-                        break
-
-
+                operations = operations_index.get(spec.handler_class)
+                if operations:
+                    spec_path = spec._path % tuple(['{%s}' % arg for arg in operations[0].parse().func_args])
+                    yield spec_path, spec, [api.parse() for api in operations]